@@ -0,0 +1,126 @@
+"""Admin endpoints, only served if enabled in configuration"""
+
+import hmac
+import logging
+from typing import Any, Callable
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from app import config
+from app.profiling import MemoryTracer, RequestTimings, SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+profiler: SamplingProfiler = SamplingProfiler()
+memory_tracer: MemoryTracer = MemoryTracer()
+request_timings: RequestTimings = RequestTimings()
+# Functions returning the metrics of each enabled subsystem, by name
+metrics_sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def check_token(x_admin_token: str | None = Header(default=None)) -> None:
+    """Dependency rejecting requests without the configured admin token.
+    Without a configured token, every request is rejected.
+
+    Raises:
+        HTTPException: Returns 403 if the token is missing or wrong
+    """
+    if (
+        config.ADMIN_TOKEN is None
+        or x_admin_token is None
+        or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN)
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(check_token)])
+
+
+@router.post("/profiler/start", status_code=204)
+def start_profiler(interval: float = config.PROFILER_INTERVAL) -> None:
+    """Start sampling the stacks of requests, discarding previous samples
+
+    Args:
+        interval (float): Time between two samples, in seconds
+
+    Raises:
+        HTTPException: Returns 422 if interval is not positive
+    """
+    try:
+        profiler.start(interval)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+
+@router.post("/profiler/stop", status_code=204)
+def stop_profiler() -> None:
+    profiler.stop()
+
+
+@router.get("/profiler/pstats")
+def get_pstats() -> Response:
+    """Samples as a file to load with pstats.Stats, e.g. with snakeviz"""
+    return Response(
+        profiler.pstats(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="blog-api.prof"'},
+    )
+
+
+@router.get("/profiler/collapsed")
+def get_collapsed_stacks() -> Response:
+    """Samples as collapsed stacks, e.g. for flamegraph.pl or speedscope"""
+    return Response(profiler.collapsed(), media_type="text/plain")
+
+
+@router.post("/tracemalloc/start", status_code=204)
+def start_tracemalloc(frames: int = 1) -> None:
+    """Start tracing allocations and take the baseline snapshot
+
+    Args:
+        frames (int): Number of frames stored for each allocation
+    """
+    memory_tracer.start(frames)
+
+
+@router.post("/tracemalloc/stop", status_code=204)
+def stop_tracemalloc() -> None:
+    memory_tracer.stop()
+
+
+@router.get("/tracemalloc/top")
+def get_top_allocations(limit: int = 20) -> list[dict[str, Any]]:
+    """Allocation sites holding the most memory
+
+    Raises:
+        HTTPException: Returns 409 if tracemalloc is not tracing
+    """
+    try:
+        return memory_tracer.top(limit)
+    except RuntimeError as rte:
+        raise HTTPException(status_code=409, detail=str(rte))
+
+
+@router.get("/tracemalloc/diff")
+def get_allocations_diff(limit: int = 20) -> list[dict[str, Any]]:
+    """Allocation sites which grew the most since the previous call
+
+    Raises:
+        HTTPException: Returns 409 if tracemalloc is not tracing
+    """
+    try:
+        return memory_tracer.diff(limit)
+    except RuntimeError as rte:
+        raise HTTPException(status_code=409, detail=str(rte))
+
+
+@router.get("/timings")
+def get_timings() -> dict[str, float]:
+    """Average duration of each step of requests since startup, in ms"""
+    return request_timings.summary()
+
+
+@router.get("/metrics")
+def get_metrics() -> dict[str, dict[str, Any]]:
+    """Metrics of each enabled subsystem, e.g. the journal"""
+    return {name: source() for name, source in metrics_sources.items()}
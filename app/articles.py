@@ -2,18 +2,33 @@
 
 import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
+from typing import (TYPE_CHECKING, Any, Callable, Iterator, MutableMapping,
+                    TypeVar)
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel
 
+from app import config
+from app.contents import ContentStore, content_hash
 from app.exceptions import (ArticleNotFoundError, InvalidArticleIdError,
-                            InvalidRequestedIdError)
-from app.utils import datetime_to_iso_string, iso_string_to_datetime
+                            InvalidPatchError, InvalidRequestedIdError)
+from app.utils import (datetime_to_iso_string, iso_string_to_datetime,
+                       iso_strings_to_datetimes, string_to_uuid)
+
+if TYPE_CHECKING:
+    # Optional subsystems, only imported by routes when enabled
+    from app.journal import Journal
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class ArticleId:
     def __init__(self, /, id: str | None = None, uuid: UUID | None = None):
@@ -25,13 +40,26 @@ class ArticleId:
             id (str | None, optional): String formatted UUID. Defaults to None.
             uuid (UUID | None, optional): UUID object. Defaults to None.
         """
-        if id is None:
+        if id is None or uuid is not None:
             self.uuid: UUID = uuid or uuid4()
         else:
-            try:
-                self.uuid: UUID = UUID(id)
-            except ValueError:
+            parsed: UUID | None = string_to_uuid(id)
+            if parsed is None:
                 raise InvalidArticleIdError(f"Id '{id}' is not a valid UUID")
+            self.uuid = parsed
+
+    @staticmethod
+    def parse(id: str) -> "ArticleId | None":
+        """Build an ArticleId from a string without raising any exception
+
+        Args:
+            id (str): String formatted UUID
+
+        Returns:
+            ArticleId | None: The Id, None if the string is not a valid UUID.
+        """
+        uuid: UUID | None = string_to_uuid(id)
+        return None if uuid is None else ArticleId(uuid=uuid)
 
     def as_str(self):
         return self.__str__()
@@ -62,8 +90,30 @@ class Article:
     ):
         self.content: str = content
         self.title: str = title
-        self.date: datetime = date
+        self.date = date
         self.id: ArticleId = id or ArticleId()
+        # Date of deletion if the article is a tombstone
+        self.deleted: datetime | None = None
+
+    @property
+    def content(self) -> str:
+        return self._content
+
+    @content.setter
+    def content(self, content: str) -> None:
+        self._content: str = content
+        # Key of the body in the content store, equal for equal bodies
+        self.content_hash: str = content_hash(content)
+
+    @property
+    def date(self) -> datetime:
+        return self._date
+
+    @date.setter
+    def date(self, date: datetime) -> None:
+        self._date: datetime = date
+        # Converted once when written instead of each time the article is read
+        self.creation: str = datetime_to_iso_string(date)
 
     def __repr__(self) -> str:
         return json.dumps(self.__dict__, default=str, indent=4)
@@ -121,14 +171,97 @@ class ResponseArticle(RequestArticle):
         id: str = article.id.as_str()
         title: str = article.title
         content: str = article.content
-        creation: str = datetime_to_iso_string(article.date)
+        creation: str = article.creation
         return ResponseArticle(
             content=content, title=title, creation=creation, id=id
         )
 
 
-# Represents the in-memory storage
-_all: dict[ArticleId, Article] = {}
+# Represents the in-memory storage, a dict unless sharded
+_all: MutableMapping[ArticleId, Article] = {}
+# Date of deletion of tombstoned articles, from the oldest to the newest
+_tombstones: dict[ArticleId, datetime] = {}
+# Durable log of mutations, if enabled
+_journal: "Journal | None" = None
+# Bodies of stored articles, tombstones included, each one stored once.
+# Unused if sharded: shard processes hold the bodies, not this one.
+_contents: ContentStore = ContentStore()
+# Incremented after each mutation, telling caches whether they are stale
+_version: int = 0
+_version_lock: threading.Lock = threading.Lock()
+# Held while applying a mutation, so readers of the bookkeeping of the
+# storage, e.g. the compactor, never see it half updated
+_write_lock: threading.Lock = threading.Lock()
+
+
+def _bump_version() -> None:
+    global _version
+    # Concurrent increments must not be lost, or a stale cache would match
+    with _version_lock:
+        _version += 1
+
+
+def store_version() -> int:
+    """Version of the storage, which changes whenever an article does"""
+    return _version
+
+
+@contextmanager
+def _mutation(operation: str, id: ArticleId, **fields: Any) -> Iterator[None]:
+    """Write a mutation to the journal, if enabled, then let the caller apply
+    it. Mutations are applied one at a time, journaled ones in journal order,
+    so replaying the journal gives back the same storage. Callers must read
+    the article they modify again from the storage within the block: the one
+    they hold may be stale, e.g. a copy if sharded.
+
+    Args:
+        operation (str): "put", "patch", "delete" or "purge"
+        id (ArticleId): Id of the mutated article
+        fields (Any): Data of the mutation
+
+    Raises:
+        JournalError: If the mutation could not be made durable. The caller
+            is then not let in.
+    """
+    if _journal is None:
+        with _write_lock:
+            yield
+        return
+    record = {"op": operation, "id": id.as_str(), "ts": time.time()}
+    record.update(fields)
+    with _journal.append_ordered(record), _write_lock:
+        yield
+
+
+def _put_fields(article: Article) -> dict[str, str]:
+    return {
+        "title": article.title,
+        "content": article.content,
+        "creation": article.creation,
+    }
+
+
+def _share_content(article: Article, previous: str | None = None) -> None:
+    """Reference the body of an article entering the storage, and make the
+    article hold the stored body instead of its own copy
+
+    Args:
+        article (Article): Article to store
+        previous (str | None, optional): Hash of the body held by the article
+            it replaces, if any, to release. Defaults to None.
+    """
+    if is_sharded():
+        # Article is pickled to its shard, which would not share the body
+        # anyway, and keeping it here would hold a copy of every body
+        return
+    if article.content_hash == previous:
+        # Same body as the replaced article: references are unchanged
+        stored: str | None = _contents.get(previous)
+        article._content = article.content if stored is None else stored
+        return
+    article._content = _contents.acquire(article.content_hash, article.content)
+    if previous is not None:
+        _contents.release(previous)
 
 
 def _add(article: Article) -> None:
@@ -137,7 +270,10 @@ def _add(article: Article) -> None:
     Args:
         article (Article): article to store
     """
-    _all[article.id] = article
+    with _mutation("put", article.id, **_put_fields(article)):
+        _share_content(article)
+        _all[article.id] = article
+        _bump_version()
 
 
 def _get(id: ArticleId) -> Article | None:
@@ -152,6 +288,9 @@ def _get(id: ArticleId) -> Article | None:
     logger.debug(f"Looking for article with id {id}")
     logger.debug(f"Storage: {_all}")
     result: Article | None = _all.get(id, None)
+    if result is not None and result.deleted is not None:
+        # Tombstones are only visible to the storage itself
+        return None
     return result
 
 
@@ -164,7 +303,289 @@ def _update(old: Article, new: Article) -> None:
     """
     # Id must be preserved when updating
     new.id = old.id
-    _all[old.id] = new
+    if (
+        new.content_hash == old.content_hash
+        and new.title == old.title
+        and new.creation == old.creation
+    ):
+        logger.debug(f"Article {old.id} is unchanged")
+        return
+    with _mutation("put", old.id, **_put_fields(new)):
+        current: Article | None = _all.get(old.id)
+        _share_content(new, None if current is None else current.content_hash)
+        _all[old.id] = new
+        _bump_version()
+
+
+def _patch(article: Article, changes: dict[str, Any]) -> None:
+    """Apply already validated changes to a stored article, in place
+
+    Args:
+        article (Article): Article to modify
+        changes (dict[str, Any]): New value of each modified attribute
+    """
+    changes = {
+        attribute: value
+        for attribute, value in changes.items()
+        if getattr(article, attribute) != value
+    }
+    if not changes:
+        logger.debug(f"Article {article.id} is unchanged")
+        return
+    with _mutation("patch", article.id, changes=_patch_fields(changes)):
+        # Storage may hold a copy of the article, e.g. if sharded, which
+        # other patches may have changed since
+        current: Article | None = _all.get(article.id)
+        if current is None:
+            logger.warning(f"Cannot patch {article.id}, it does not exist")
+            return
+        previous: str = current.content_hash
+        for attribute, value in changes.items():
+            setattr(current, attribute, value)
+        _share_content(current, previous)
+        _all[article.id] = current
+        _bump_version()
+
+
+def _patch_fields(changes: dict[str, Any]) -> dict[str, Any]:
+    """Changes of attributes, as members of a JSON article"""
+    fields: dict[str, Any] = dict(changes)
+    if "date" in fields:
+        fields["creation"] = datetime_to_iso_string(fields.pop("date"))
+    return fields
+
+
+def _delete(article: Article, soft: bool = False) -> None:
+    """Remove an article from storage
+
+    Args:
+        article (Article): Article to remove
+        soft (bool, optional): If True, the article is kept as a tombstone
+            until compacted. Defaults to False.
+    """
+    if soft:
+        deleted: datetime = datetime.now()
+        iso: str = datetime_to_iso_string(deleted)
+        with _mutation("delete", article.id, deleted=iso):
+            current: Article | None = _all.get(article.id)
+            if current is None:
+                logger.warning(f"Cannot delete {article.id}, it is gone")
+                return
+            current.deleted = deleted
+            _all[article.id] = current
+            _tombstones[article.id] = deleted
+            _bump_version()
+    else:
+        _purge(article.id)
+
+
+def _purge(id: ArticleId) -> None:
+    """Reclaim everything stored for the given Id, tombstone included
+
+    Args:
+        id (ArticleId): Id of the article to purge
+    """
+    with _mutation("purge", id):
+        _remove(id)
+
+
+def _remove(id: ArticleId) -> None:
+    article: Article | None = _all.pop(id, None)
+    if article is not None and not is_sharded():
+        _contents.release(article.content_hash)
+    _tombstones.pop(id, None)
+    _bump_version()
+
+
+def compact(older_than: datetime, deadline: float) -> int:
+    """Purge tombstones, from the oldest, until reaching one deleted after
+    'older_than' or running out of time.
+
+    Args:
+        older_than (datetime): Only tombstones deleted before are purged
+        deadline (float): Value of time.perf_counter() at which to stop
+
+    Returns:
+        int: Number of purged tombstones
+    """
+    purged: int = 0
+    while time.perf_counter() < deadline:
+        # Request threads add tombstones meanwhile
+        with _write_lock:
+            oldest = next(iter(_tombstones.items()), None)
+        if oldest is None or oldest[1] >= older_than:
+            break
+        _purge(oldest[0])
+        purged += 1
+    if purged:
+        logger.debug(f"Compacted {purged} tombstones")
+    return purged
+
+
+def set_storage(
+    storage: MutableMapping[ArticleId, Article]
+) -> MutableMapping[ArticleId, Article]:
+    """Replace the in-memory storage, e.g. by a ShardedStore
+
+    Args:
+        storage (MutableMapping[ArticleId, Article]): New storage
+
+    Returns:
+        MutableMapping[ArticleId, Article]: Replaced storage
+    """
+    global _all
+    previous, _all = _all, storage
+    _bump_version()
+    return previous
+
+
+def set_journal(journal: "Journal | None") -> None:
+    """Set the journal mutations are written to, None to disable it
+
+    Args:
+        journal (Journal | None): Journal
+    """
+    global _journal
+    _journal = journal
+
+
+def clear() -> None:
+    """Remove every article from storage, tombstones included"""
+    _all.clear()
+    _tombstones.clear()
+    _contents.clear()
+    _bump_version()
+
+
+def content_metrics() -> dict[str, Any]:
+    """Number of distinct bodies and memory saved by sharing them"""
+    return _contents.metrics()
+
+
+def apply_record(record: dict[str, Any]) -> None:
+    """Apply a mutation read from a journal, without journaling it again
+
+    Args:
+        record (dict[str, Any]): Mutation
+    """
+    apply_records([record])
+
+
+def apply_records(records: list[dict[str, Any]]) -> None:
+    """Apply mutations read from a journal, without journaling them again.
+    The dates of all mutations are converted in a single pass.
+
+    Args:
+        records (list[dict[str, Any]]): Mutations, in journal order
+    """
+    dates: list[datetime] = iso_strings_to_datetimes(
+        _record_date(record) for record in records
+    )
+    for record, date in zip(records, dates):
+        _apply(record, date)
+
+
+def _record_date(record: dict[str, Any]) -> str | None:
+    """The date held by a mutation, if any"""
+    operation: str = record["op"]
+    if operation == "put":
+        return record["creation"]
+    if operation == "delete":
+        return record["deleted"]
+    if operation == "patch":
+        return record["changes"].get("creation")
+    return None
+
+
+def _apply(record: dict[str, Any], date: datetime) -> None:
+    """Apply one mutation read from a journal
+
+    Args:
+        record (dict[str, Any]): Mutation
+        date (datetime): Converted date of the mutation, if it holds one
+    """
+    id: ArticleId = ArticleId(id=record["id"])
+    operation: str = record["op"]
+    article: Article | None = _all.get(id)
+    if operation == "put":
+        new = Article(record["content"], record["title"], date, id)
+        _share_content(new, None if article is None else article.content_hash)
+        _all[id] = new
+        _bump_version()
+        return
+    if operation == "purge":
+        _remove(id)
+        return
+    if article is None:
+        logger.warning(f"Cannot apply '{operation}', {id} does not exist")
+        return
+    if operation == "patch":
+        previous: str = article.content_hash
+        for key, value in record["changes"].items():
+            if key == "creation":
+                article.date = date
+            else:
+                setattr(article, key, value)
+        _share_content(article, previous)
+    elif operation == "delete":
+        article.deleted = date
+        _tombstones[id] = article.deleted
+    _all[id] = article
+    _bump_version()
+
+
+def is_sharded() -> bool:
+    # Storage is a dict unless sharded, which spares importing app.sharding
+    return not isinstance(_all, dict)
+
+
+def _if_live(
+    func: Callable[[Article], T], _: ArticleId, article: Article
+) -> T | None:
+    return None if article.deleted is not None else func(article)
+
+
+def map_articles(func: Callable[[Article], T]) -> list[T]:
+    """Apply a function to all stored articles, in storage order.
+    With a sharded storage, it runs in the shard processes, in parallel.
+
+    Args:
+        func (Callable[[Article], T]): Function to apply, must be picklable
+
+    Returns:
+        list[T]: Results
+    """
+    if is_sharded():
+        return _all.map(partial(_if_live, func))  # type: ignore
+    return [func(article) for article in list_articles()]
+
+
+def _requested_id(id: str) -> ArticleId:
+    """Parse the Id of an article requested by API consumer
+
+    Args:
+        id (str): Requested Id
+
+    Raises:
+        InvalidRequestedIdError: If provided argument 'id' is invalid.
+
+    Returns:
+        ArticleId: Parsed Id
+    """
+    article_id: ArticleId | None = ArticleId.parse(id)
+    if article_id is None:
+        raise InvalidRequestedIdError(f"Id '{id}' is not a valid article Id")
+    return article_id
+
+
+def list_articles() -> list[Article]:
+    """Get all stored articles, without converting them
+
+    Returns:
+        list[Article]: All articles
+    """
+    # Copying values first is atomic, so concurrent writes cannot break it
+    return [a for a in list(_all.values()) if a.deleted is None]
 
 
 def get_all() -> list[ResponseArticle]:
@@ -174,33 +595,47 @@ def get_all() -> list[ResponseArticle]:
     Returns:
         list[ResponseArticle]: All articles
     """
-    return [ResponseArticle.from_article(article) for article in _all.values()]
+    return [ResponseArticle.from_article(a) for a in list_articles()]
 
 
-def get_by_id(id: str) -> ResponseArticle:
-    """Get one article from storage if exists
+def find_by_id(id: str) -> Article:
+    """Get one article from storage if exists, without converting it
 
     Args:
         id (str): Id of the article to get
 
     Raises:
         InvalidRequestedIdError: If provided argument 'id' is invalid.
+        ArticleNotFoundError: If provided argument 'id' cannot be found.
 
     Returns:
-        ResponseArticle | None: Article
+        Article: Article
     """
-    try:
-        article_id: ArticleId = ArticleId(id=id)
-    except InvalidArticleIdError:
-        raise InvalidRequestedIdError(f"Id '{id}' is not a valid article Id")
+    article_id: ArticleId = _requested_id(id)
 
     article: Article | None = _get(article_id)
     if article:
-        return ResponseArticle.from_article(article)
+        return article
     else:
         raise ArticleNotFoundError(f"Id '{id}' doest not exist.")
 
 
+def get_by_id(id: str) -> ResponseArticle:
+    """Get one article from storage if exists
+
+    Args:
+        id (str): Id of the article to get
+
+    Raises:
+        InvalidRequestedIdError: If provided argument 'id' is invalid.
+        ArticleNotFoundError: If provided argument 'id' cannot be found.
+
+    Returns:
+        ResponseArticle | None: Article
+    """
+    return ResponseArticle.from_article(find_by_id(id))
+
+
 def create(request: RequestArticle) -> str:
     """Create a new article
 
@@ -231,10 +666,7 @@ def update(id: str, request: RequestArticle) -> None:
         InvalidRequestedIdError: If provided argument 'id' is invalid.
         ArticleNotFoundError: If provided argument 'id' cannot be found.
     """
-    try:
-        article_id: ArticleId = ArticleId(id=id)
-    except InvalidArticleIdError:
-        raise InvalidRequestedIdError(f"Id '{id}' is not a valid article Id")
+    article_id: ArticleId = _requested_id(id)
 
     old: Article | None = _get(article_id)
     if old:
@@ -242,3 +674,81 @@ def update(id: str, request: RequestArticle) -> None:
         _update(old, new)
     else:
         raise ArticleNotFoundError(f"Id '{id}' doest not exist.")
+
+
+def delete(id: str) -> None:
+    """Delete the article with given Id if it exists.
+    Depending on configuration, it is either removed right away or kept as a
+    tombstone until compacted.
+
+    Args:
+        id (str): Id of the article to delete
+
+    Raises:
+        InvalidRequestedIdError: If provided argument 'id' is invalid.
+        ArticleNotFoundError: If provided argument 'id' cannot be found.
+    """
+    article_id: ArticleId = _requested_id(id)
+
+    old: Article | None = _get(article_id)
+    if old:
+        _delete(old, soft=config.SOFT_DELETE)
+    else:
+        raise ArticleNotFoundError(f"Id '{id}' doest not exist.")
+
+
+def _validate_patch(article: Article, patch: dict[str, Any]) -> dict[str, Any]:
+    """Check a JSON Merge Patch (RFC 7396) against an article and convert it
+    into the changes of its attributes
+
+    Args:
+        article (Article): Article to patch
+        patch (dict[str, Any]): Merge patch sent by API consumer
+
+    Raises:
+        InvalidPatchError: If the patch cannot be applied to the article.
+
+    Returns:
+        dict[str, Any]: New value of each modified attribute
+    """
+    changes: dict[str, Any] = {}
+    for key, value in patch.items():
+        if key in ("title", "content"):
+            # null would remove the member, but both are mandatory
+            if not isinstance(value, str):
+                raise InvalidPatchError(f"'{key}' must be a string")
+            changes[key] = value
+        elif key == "creation":
+            if not isinstance(value, str):
+                raise InvalidPatchError("'creation' must be a string")
+            try:
+                changes["date"] = datetime.fromisoformat(value)
+            except ValueError:
+                raise InvalidPatchError(f"'{value}' is not an ISO date")
+        elif key == "id":
+            if value != article.id.as_str():
+                raise InvalidPatchError("'id' cannot be modified")
+        else:
+            raise InvalidPatchError(f"Articles have no member '{key}'")
+    return changes
+
+
+def apply_patch(id: str, patch: dict[str, Any]) -> None:
+    """Modify only the members of the article given in a JSON Merge Patch.
+
+    Args:
+        id (str): Id of the article to patch
+        patch (dict[str, Any]): Merge patch sent by API consumer
+
+    Raises:
+        InvalidRequestedIdError: If provided argument 'id' is invalid.
+        ArticleNotFoundError: If provided argument 'id' cannot be found.
+        InvalidPatchError: If the patch cannot be applied to the article.
+    """
+    article_id: ArticleId = _requested_id(id)
+
+    article: Article | None = _get(article_id)
+    if article:
+        _patch(article, _validate_patch(article, patch))
+    else:
+        raise ArticleNotFoundError(f"Id '{id}' doest not exist.")
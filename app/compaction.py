@@ -0,0 +1,68 @@
+"""Background compaction of tombstoned articles"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.articles import compact
+
+logger = logging.getLogger(__name__)
+
+
+class Compactor:
+    """Thread periodically purging tombstones older than a given age.
+
+    Each run may only last a share of the interval between two runs, so the
+    compactor never uses more than 'budget' of one CPU.
+    """
+
+    def __init__(self, interval: float, budget: float, ttl: float):
+        """
+        Args:
+            interval (float): Time between two runs, in seconds
+            budget (float): Fraction of one CPU the compactor may use
+            ttl (float): Minimal age of a tombstone to be purged, in seconds
+        """
+        if not 0 < budget <= 1:
+            raise ValueError(f"Budget must be in ]0, 1], got {budget}")
+        self.interval: float = interval
+        self.budget: float = budget
+        self.ttl: timedelta = timedelta(seconds=ttl)
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> int:
+        """Purge tombstones during at most 'budget * interval' seconds
+
+        Returns:
+            int: Number of purged tombstones
+        """
+        deadline: float = time.perf_counter() + self.budget * self.interval
+        return compact(datetime.now() - self.ttl, deadline)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="compactor", daemon=True
+        )
+        self._thread.start()
+        logger.info("Compactor started")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        logger.info("Compactor stopped")
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                # Left for the next run, e.g. if the journal is unavailable
+                logger.error(f"Could not compact tombstones: {e}")
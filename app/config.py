@@ -0,0 +1,85 @@
+"""Runtime configuration of the app, read from environment variables"""
+
+import os
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value: str | None = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _env_set(name: str) -> frozenset[str]:
+    # Comma-separated values, blank ones ignored
+    values: list[str] = os.environ.get(name, "").split(",")
+    return frozenset(value.strip() for value in values if value.strip())
+
+
+# Name of the engine used to (de)serialize articles: "pydantic" or "orjson"
+SERIALIZER: str = os.environ.get("BLOG_API_SERIALIZER", "pydantic")
+
+# If True, deleted articles are kept as tombstones until compacted
+SOFT_DELETE: bool = _env_bool("BLOG_API_SOFT_DELETE")
+# Minimal age of a tombstone before it can be compacted, in seconds
+TOMBSTONE_TTL: float = _env_float("BLOG_API_TOMBSTONE_TTL", 60.0)
+# Time between two compaction runs, in seconds
+COMPACTION_INTERVAL: float = _env_float("BLOG_API_COMPACTION_INTERVAL", 1.0)
+# Fraction of one CPU the compactor may use (0.05 -> 5% of each interval)
+COMPACTION_BUDGET: float = _env_float("BLOG_API_COMPACTION_BUDGET", 0.05)
+
+# If True, endpoints under /admin expose profiling and memory tracing
+ADMIN: bool = _env_bool("BLOG_API_ADMIN")
+# Value admin endpoints require in the 'X-Admin-Token' header. Mandatory if
+# admin endpoints are enabled
+ADMIN_TOKEN: str | None = os.environ.get("BLOG_API_ADMIN_TOKEN")
+# If True, responses carry a 'Server-Timing' header
+SERVER_TIMING: bool = _env_bool("BLOG_API_SERVER_TIMING")
+# Default time between two samples of the CPU profiler, in seconds
+PROFILER_INTERVAL: float = _env_float("BLOG_API_PROFILER_INTERVAL", 0.005)
+
+# Number of worker processes the storage is split across, 0 to disable
+SHARDS: int = _env_int("BLOG_API_SHARDS", 0)
+
+# Path of the journal file making mutations durable, None to disable
+JOURNAL_PATH: str | None = os.environ.get("BLOG_API_JOURNAL_PATH")
+# Maximal number of mutations synced to disk at once
+JOURNAL_MAX_BATCH: int = _env_int("BLOG_API_JOURNAL_MAX_BATCH", 256)
+# Maximal time a mutation waits for others before being synced, in seconds
+JOURNAL_MAX_DELAY: float = _env_float("BLOG_API_JOURNAL_MAX_DELAY", 0.002)
+# Maximal number of mutations waiting to be synced
+JOURNAL_QUEUE_SIZE: int = _env_int("BLOG_API_JOURNAL_QUEUE_SIZE", 4096)
+
+# Path of the journal of a primary to follow. If set, the app is read-only
+FOLLOW_JOURNAL: str | None = os.environ.get("BLOG_API_FOLLOW_JOURNAL")
+# Time between two checks for new mutations in the followed journal
+FOLLOW_INTERVAL: float = _env_float("BLOG_API_FOLLOW_INTERVAL", 0.05)
+# URL of the primary writes are forwarded to. If None, they are rejected
+PRIMARY_URL: str | None = os.environ.get("BLOG_API_PRIMARY_URL")
+
+# Tokens given back to each client per second, 0 to disable rate limiting
+RATE_LIMIT: float = _env_float("BLOG_API_RATE_LIMIT", 0.0)
+# Maximal number of tokens a client can accumulate
+RATE_LIMIT_BURST: float = _env_float("BLOG_API_RATE_LIMIT_BURST", 50.0)
+# Tokens taken by listing all articles. Other article endpoints take one
+RATE_LIMIT_LIST_COST: float = _env_float("BLOG_API_RATE_LIMIT_LIST_COST", 10.0)
+# Maximal number of clients whose bucket is kept at once
+RATE_LIMIT_CLIENTS: int = _env_int("BLOG_API_RATE_LIMIT_CLIENTS", 65536)
+# API keys clients are limited by, comma-separated. Clients sending another
+# 'X-API-Key', or none, are limited by IP address
+RATE_LIMIT_API_KEYS: frozenset[str] = _env_set("BLOG_API_RATE_LIMIT_API_KEYS")
+
+# Number of most recently created articles listed by /articles/stats
+STATS_LATEST: int = _env_int("BLOG_API_STATS_LATEST", 10)
+
+# If True, the storage is loaded (journal replay...) after the server started,
+# and article endpoints answer 503 until done. See /healthz and /readyz
+BACKGROUND_WARMUP: bool = _env_bool("BLOG_API_BACKGROUND_WARMUP")
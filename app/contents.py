@@ -0,0 +1,108 @@
+"""Content-addressed storage of the bodies of articles.
+
+Each distinct body is stored once, under its hash, along with the number of
+stored articles holding it. Articles holding the same body share the stored
+string, and comparing their hashes tells whether two bodies are the same
+without comparing the bodies themselves.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    """Hash identifying a body
+
+    Args:
+        content (str): Body of an article
+
+    Returns:
+        str: Hexadecimal digest, 32 characters long
+    """
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+class ContentStore:
+    """Bodies stored once under their hash, with reference counts"""
+
+    def __init__(self) -> None:
+        self._bodies: dict[str, str] = {}
+        self._references: dict[str, int] = {}
+        # Concurrent writers must not lose references, or a body in use
+        # would be dropped
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self, digest: str, content: str) -> str:
+        """Add a reference to a body, storing it if it is not stored yet
+
+        Args:
+            digest (str): Hash of the body
+            content (str): Body
+
+        Returns:
+            str: Stored body, to be held instead of the given one
+        """
+        with self._lock:
+            stored: str | None = self._bodies.get(digest)
+            if stored is None:
+                self._bodies[digest] = stored = content
+                self._references[digest] = 1
+            else:
+                self._references[digest] += 1
+        return stored
+
+    def release(self, digest: str) -> None:
+        """Remove a reference to a body, dropping it once unreferenced
+
+        Args:
+            digest (str): Hash of the body
+        """
+        with self._lock:
+            references: int | None = self._references.get(digest)
+            if references is None:
+                logger.warning(f"Body {digest} is not stored")
+            elif references == 1:
+                del self._references[digest]
+                del self._bodies[digest]
+            else:
+                self._references[digest] = references - 1
+
+    def get(self, digest: str) -> str | None:
+        return self._bodies.get(digest)
+
+    def references(self, digest: str) -> int:
+        return self._references.get(digest, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
+            self._references.clear()
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def metrics(self) -> dict[str, Any]:
+        """Number of bodies and memory saved by sharing them
+
+        Returns:
+            dict[str, Any]: Distinct bodies, references to them, and the
+            number of characters stored and saved
+        """
+        stored: int = 0
+        saved: int = 0
+        with self._lock:
+            for digest, body in self._bodies.items():
+                stored += len(body)
+                saved += len(body) * (self._references[digest] - 1)
+            references: int = sum(self._references.values())
+            bodies: int = len(self._bodies)
+        return {
+            "bodies": bodies,
+            "references": references,
+            "stored_characters": stored,
+            "saved_characters": saved,
+        }
@@ -27,3 +27,21 @@ class ArticleNotFoundError(ServerError):
     """Raised if no article can be found with the given Id"""
 
     message = "Requested article Id doest not exist"
+
+
+class InvalidArticleBodyError(ServerError):
+    """Raised if the body of a request cannot be parsed as an article"""
+
+    message = "Request body is not a valid article"
+
+
+class InvalidPatchError(ServerError):
+    """Raised if a patch cannot be applied to an article"""
+
+    message = "Patch is not valid for an article"
+
+
+class JournalError(ServerError):
+    """Raised if a mutation cannot be written to the journal"""
+
+    message = "Mutation could not be made durable"
@@ -0,0 +1,274 @@
+"""Durable log of the mutations of the storage, written with group commit.
+
+Each mutation is appended as one JSON line. Instead of syncing the file to
+disk once per mutation, a background writer gathers the mutations queued by
+concurrent requests and syncs them at once. A request is acknowledged only
+when the batch holding its mutation is durable.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from app.exceptions import JournalError
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    """Mutation waiting for its batch to be durable"""
+
+    __slots__ = ("line", "sequence", "done", "error")
+
+    def __init__(self, line: bytes, sequence: int):
+        self.line: bytes = line
+        # Position of the mutation in the journal
+        self.sequence: int = sequence
+        self.done: threading.Event = threading.Event()
+        self.error: BaseException | None = None
+
+
+class Journal:
+    """Append-only file of mutations, synced to disk by batches"""
+
+    def __init__(
+        self,
+        path: str,
+        max_batch: int = 256,
+        max_delay: float = 0.002,
+        queue_size: int = 4096,
+    ):
+        """
+        Args:
+            path (str): Path of the journal file, created if needed
+            max_batch (int, optional): Maximal number of mutations per batch.
+                Defaults to 256.
+            max_delay (float, optional): Maximal time a batch waits for more
+                mutations before being written, in seconds. Defaults to 0.002.
+            queue_size (int, optional): Maximal number of mutations waiting
+                to be written. Appending blocks when reached. Defaults to 4096.
+        """
+        self.path: str = path
+        self.max_batch: int = max_batch
+        self.max_delay: float = max_delay
+        self._queue: queue.Queue[_Pending | None] = queue.Queue(queue_size)
+        # Written without buffering, so a failed batch can be truncated away
+        self._fd: int = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        # Set if the file may hold a mutation which was not acknowledged
+        self._failure: OSError | None = None
+        # Sequence numbers are given in queue order, which is file order
+        self._sequence_lock: threading.Lock = threading.Lock()
+        self._next_sequence: int = 0
+        # Sequence number of the last mutation applied by append_ordered()
+        self._applied: int = -1
+        self._turn: threading.Condition = threading.Condition()
+        self._batches: int = 0
+        self._records: int = 0
+        self._max_batch_seen: int = 0
+        self._commit_time: float = 0.0
+        self._max_commit_time: float = 0.0
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="journal-writer", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Append a mutation and wait until it is durable
+
+        Args:
+            record (dict[str, Any]): Mutation, must be JSON serializable
+
+        Raises:
+            JournalError: If the mutation could not be written.
+        """
+        with self.append_ordered(record):
+            pass
+
+    @contextmanager
+    def append_ordered(self, record: dict[str, Any]) -> Iterator[None]:
+        """Append a mutation, wait until it is durable, then let the caller
+        apply it. Callers are let in one at a time, in journal order, so
+        mutations are applied in the order they are replayed.
+
+        Args:
+            record (dict[str, Any]): Mutation, must be JSON serializable
+
+        Raises:
+            JournalError: If the mutation could not be written, in which case
+                it must not be applied.
+        """
+        pending: _Pending = self._enqueue(record)
+        pending.done.wait()
+        with self._turn:
+            self._turn.wait_for(
+                lambda: self._applied == pending.sequence - 1
+            )
+        try:
+            if pending.error is not None:
+                raise JournalError(str(pending.error))
+            yield
+        finally:
+            with self._turn:
+                self._applied = pending.sequence
+                self._turn.notify_all()
+
+    def _enqueue(self, record: dict[str, Any]) -> _Pending:
+        line: bytes = json.dumps(record).encode() + b"\n"
+        with self._sequence_lock:
+            pending = _Pending(line, self._next_sequence)
+            self._next_sequence += 1
+            self._queue.put(pending)
+        return pending
+
+    def close(self) -> None:
+        """Write the queued mutations, then stop the writer"""
+        self._queue.put(None)
+        self._thread.join()
+        os.close(self._fd)
+
+    def metrics(self) -> dict[str, Any]:
+        """Statistics of the commits since the journal was opened
+
+        Returns:
+            dict[str, Any]: Configuration, batch sizes and commit durations
+        """
+        batches: int = self._batches or 1
+        return {
+            "max_batch": self.max_batch,
+            "max_delay": self.max_delay,
+            "queued": self._queue.qsize(),
+            "batches": self._batches,
+            "records": self._records,
+            "mean_batch_size": self._records / batches,
+            "largest_batch_size": self._max_batch_seen,
+            "mean_commit_seconds": self._commit_time / batches,
+            "max_commit_seconds": self._max_commit_time,
+            "failed": self._failure is not None,
+        }
+
+    def _next_batch(self) -> tuple[list[_Pending], bool]:
+        """Wait for a first mutation, then gather more until the batch is
+        full or the delay is over.
+
+        Returns:
+            tuple[list[_Pending], bool]: Batch, and whether to stop afterwards
+        """
+        first: _Pending | None = self._queue.get()
+        if first is None:
+            return [], True
+        batch: list[_Pending] = [first]
+        deadline: float = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout: float = deadline - time.monotonic()
+            try:
+                pending = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if pending is None:
+                return batch, True
+            batch.append(pending)
+        return batch, False
+
+    def _commit(self, batch: list[_Pending]) -> None:
+        start: float = time.perf_counter()
+        error: BaseException | None = self._failure
+        if error is None:
+            try:
+                self._write(b"".join(pending.line for pending in batch))
+            except OSError as oe:
+                logger.error(f"Could not write {len(batch)} mutations: {oe}")
+                error = oe
+        duration: float = time.perf_counter() - start
+        self._batches += 1
+        self._records += len(batch)
+        self._max_batch_seen = max(self._max_batch_seen, len(batch))
+        self._commit_time += duration
+        self._max_commit_time = max(self._max_commit_time, duration)
+        for pending in batch:
+            pending.error = error
+            pending.done.set()
+
+    def _write(self, data: bytes) -> None:
+        """Write and sync data at the end of the file. On failure, the file
+        is truncated back, as none of the mutations will be acknowledged.
+
+        Raises:
+            OSError: If data could not be made durable.
+        """
+        offset: int = os.lseek(self._fd, 0, os.SEEK_END)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self._fd, view) :]
+            os.fsync(self._fd)
+        except OSError:
+            try:
+                os.ftruncate(self._fd, offset)
+                os.fsync(self._fd)
+            except OSError as oe:
+                # Rejected mutations may be replayed: refuse any other one
+                logger.critical(f"Could not remove rejected mutations: {oe}")
+                self._failure = oe
+            raise
+
+    def _run(self) -> None:
+        stopped: bool = False
+        while not stopped:
+            batch, stopped = self._next_batch()
+            if batch:
+                self._commit(batch)
+
+
+def read(path: str, offset: int = 0) -> Iterator[tuple[dict[str, Any], int]]:
+    """Read the complete mutations of a journal file
+
+    Args:
+        path (str): Path of the journal file
+        offset (int, optional): Position to start reading from. Defaults to 0.
+
+    Yields:
+        tuple[dict[str, Any], int]: Each mutation, along with the position
+        following it. A trailing partial line is not read.
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            yield json.loads(line), offset
+
+
+def read_batches(
+    path: str, offset: int = 0, size: int = 1024
+) -> Iterator[tuple[list[dict[str, Any]], int]]:
+    """Read the complete mutations of a journal file by batches, e.g. to
+    apply them with articles.apply_records()
+
+    Args:
+        path (str): Path of the journal file
+        offset (int, optional): Position to start reading from. Defaults to 0.
+        size (int, optional): Maximal number of mutations per batch.
+            Defaults to 1024.
+
+    Yields:
+        tuple[list[dict[str, Any]], int]: Each batch of mutations, along with
+        the position following its last mutation
+    """
+    batch: list[dict[str, Any]] = []
+    for record, offset in read(path, offset):
+        batch.append(record)
+        if len(batch) == size:
+            yield batch, offset
+            batch = []
+    if batch:
+        yield batch, offset
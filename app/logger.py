@@ -1,34 +1,31 @@
-"""Configuration of logging module for the whole app"""
+"""Configuration of logging module for the whole app.
 
-import logging.config
-from typing import Any
+Set up through the logging API, as 'logging.config' would import modules
+(logging.handlers, socketserver...) the app never uses, slowing startup.
+"""
 
-# Configuration dict
-config: dict[str, Any] = {
-    "version": 1,  # 1 is the only accepted value
-    "formatters": {
-        "simple": {
-            "format": "%(asctime)s - %(name)s.%(funcName)s:%(lineno)s - %(levelname)s - %(message)s"
-        }
-    },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "level": "DEBUG",
-            "formatter": "simple",
-            "stream": "ext://sys.stdout",
-        }
-    },
-    "loggers": {
-        # Any module in 'app' package will inherit from this configuration
-        # if getting a logger with its own __name__ (e.g.: app.routes)
-        "app": {
-            "level": "DEBUG",
-            "handlers": ["console"],
-        }
-    },
-    "root": {"level": "DEBUG"},
-}
+import logging
+import sys
 
-# Application of the configuration
-logging.config.dictConfig(config)
+formatter = logging.Formatter(
+    "%(asctime)s - %(name)s.%(funcName)s:%(lineno)s - %(levelname)s - %(message)s"
+)
+
+handler = logging.StreamHandler(sys.stdout)
+handler.setLevel(logging.DEBUG)
+handler.setFormatter(formatter)
+
+# Any module in 'app' package will inherit from this configuration
+# if getting a logger with its own __name__ (e.g.: app.routes)
+app_logger = logging.getLogger("app")
+app_logger.setLevel(logging.DEBUG)
+app_logger.addHandler(handler)
+
+logging.getLogger().setLevel(logging.DEBUG)
+
+# Loggers created beforehand are disabled, as dictConfig() used to do
+for name, existing in logging.Logger.manager.loggerDict.items():
+    if isinstance(existing, logging.Logger) and not (
+        name == "app" or name.startswith("app.")
+    ):
+        existing.disabled = True
@@ -1,7 +1,15 @@
 """FastAPI defaults to launching app from 'main' module."""
 
+# Only depends on the standard library, so it can time the other imports
+from app.startup import report
+
 # Logging configuration must occur before anything else
-import app.logger  # pyright: ignore [reportUnusedImport]
+with report.phase("import logging"):
+    import app.logger  # pyright: ignore [reportUnusedImport]
+
+with report.phase("import fastapi"):
+    import fastapi  # pyright: ignore [reportUnusedImport]
 
 # 'app' object must then be in main's namespace
-from app.routes import app  # pyright: ignore [reportUnusedImport]
+with report.phase("import app"):
+    from app.routes import app  # pyright: ignore [reportUnusedImport]
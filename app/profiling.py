@@ -0,0 +1,356 @@
+"""Opt-in tools showing where time and memory go while serving requests:
+- a sampling CPU profiler, exported as pstats or collapsed stacks
+- snapshots of allocations traced by tracemalloc
+- timing spans of each request, returned in a 'Server-Timing' header
+"""
+
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+import fastapi
+import starlette
+
+logger = logging.getLogger(__name__)
+
+# (filename, first line, function name), as used by pstats
+Func = tuple[str, int, str]
+
+# Only stacks going through one of these packages belong to requests
+_REQUEST_PATHS: tuple[str, ...] = tuple(
+    os.path.dirname(os.path.abspath(path)) + os.sep
+    for path in (__file__, fastapi.__file__, starlette.__file__)
+    if path
+)
+
+# Threads started by the app itself. They run code of the app, but never
+# serve requests, so they must not be sampled.
+BACKGROUND_THREADS: frozenset[str] = frozenset(
+    {"compactor", "follower", "journal-writer", "sampling-profiler", "warm-up"}
+)
+
+
+class SamplingProfiler:
+    """Thread sampling the stacks of the other threads at a fixed interval,
+    while at least one request is being served.
+    """
+
+    def __init__(self) -> None:
+        self.interval: float = 0.0
+        # Number of requests being served, maintained by TimingMiddleware
+        self.active_requests: int = 0
+        self.samples: Counter[tuple[Func, ...]] = Counter()
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float) -> None:
+        """Start sampling, discarding samples of any previous run
+
+        Args:
+            interval (float): Time between two samples, in seconds
+        """
+        if interval <= 0:
+            raise ValueError(f"Interval must be positive, got {interval}")
+        self.stop()
+        self.interval = interval
+        self.samples.clear()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Profiler started, sampling every {interval}s")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        logger.info(f"Profiler stopped, {sum(self.samples.values())} samples")
+
+    def sample(self) -> None:
+        """Record the stack of each thread currently serving a request"""
+        background: set[int | None] = {
+            thread.ident
+            for thread in threading.enumerate()
+            if thread.name in BACKGROUND_THREADS
+        }
+        background.add(threading.get_ident())
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in background:
+                continue
+            stack: list[Func] = []
+            in_request: bool = False
+            while frame is not None:
+                code = frame.f_code
+                filename: str = code.co_filename
+                stack.append((filename, code.co_firstlineno, code.co_name))
+                in_request = in_request or filename.startswith(_REQUEST_PATHS)
+                frame = frame.f_back
+            if in_request:
+                # Stacks are stored from the outermost call to the innermost
+                self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in the "collapsed stacks" format read by flame graph tools
+
+        Returns:
+            str: One line per distinct stack, followed by its number of samples
+        """
+        lines: list[str] = []
+        for stack, count in self.samples.most_common():
+            frames = ";".join(
+                f"{name} ({os.path.basename(filename)}:{line})"
+                for filename, line, name in stack
+            )
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def pstats(self) -> bytes:
+        """Samples converted into the format written by pstats.dump_stats().
+        Each sample accounts for one call lasting 'interval' seconds.
+
+        Returns:
+            bytes: Content of a file readable by pstats.Stats
+        """
+        stats: dict[Func, list[Any]] = {}
+        for stack, count in self.samples.items():
+            duration: float = count * self.interval
+            seen: set[Func] = set()
+            for depth, func in enumerate(stack):
+                cc, nc, tt, ct, callers = stats.setdefault(
+                    func, [0, 0, 0.0, 0.0, {}]
+                )
+                leaf: bool = depth == len(stack) - 1
+                # Recursive calls are only counted once in cumulative time
+                ct += 0.0 if func in seen else duration
+                seen.add(func)
+                stats[func] = [
+                    cc + count,
+                    nc + count,
+                    tt + (duration if leaf else 0.0),
+                    ct,
+                    callers,
+                ]
+                if depth:
+                    caller: Func = stack[depth - 1]
+                    ccc, cnc, ctt, cct = callers.get(caller, (0, 0, 0.0, 0.0))
+                    callers[caller] = (
+                        ccc + count,
+                        cnc + count,
+                        ctt + (duration if leaf else 0.0),
+                        cct + duration,
+                    )
+        return marshal.dumps({func: tuple(s) for func, s in stats.items()})
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if self.active_requests:
+                self.sample()
+
+
+class MemoryTracer:
+    """Top allocation sites traced by tracemalloc, and their evolution since
+    a baseline snapshot.
+    """
+
+    def __init__(self) -> None:
+        self.baseline: tracemalloc.Snapshot | None = None
+
+    def start(self, frames: int = 1) -> None:
+        tracemalloc.start(frames)
+        self.baseline = self.snapshot()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.baseline = None
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        """Take a snapshot, without tracemalloc's own allocations
+
+        Raises:
+            RuntimeError: If tracemalloc is not tracing.
+
+        Returns:
+            tracemalloc.Snapshot: Current snapshot
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        return tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ]
+        )
+
+    def top(self, limit: int) -> list[dict[str, Any]]:
+        """Allocation sites holding the most memory
+
+        Args:
+            limit (int): Maximal number of sites
+
+        Returns:
+            list[dict[str, Any]]: Site, size in bytes and number of blocks
+        """
+        statistics = self.snapshot().statistics("lineno")
+        return [
+            {"site": str(s.traceback), "size": s.size, "count": s.count}
+            for s in statistics[:limit]
+        ]
+
+    def diff(self, limit: int) -> list[dict[str, Any]]:
+        """Allocation sites whose memory grew the most since the baseline.
+        The current snapshot then becomes the baseline.
+
+        Args:
+            limit (int): Maximal number of sites
+
+        Returns:
+            list[dict[str, Any]]: Site, size and number of blocks, along with
+            their difference with the baseline
+        """
+        snapshot: tracemalloc.Snapshot = self.snapshot()
+        if self.baseline is None:
+            self.baseline = snapshot
+        statistics = snapshot.compare_to(self.baseline, "lineno")
+        self.baseline = snapshot
+        return [
+            {
+                "site": str(s.traceback),
+                "size": s.size,
+                "size_diff": s.size_diff,
+                "count": s.count,
+                "count_diff": s.count_diff,
+            }
+            for s in statistics[:limit]
+        ]
+
+
+# Durations of the spans of the request being served, in seconds
+_timings: ContextVar[dict[str, float] | None] = ContextVar(
+    "timings", default=None
+)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Measure the duration of a step of the request being served.
+    Does nothing if request timing is disabled.
+
+    Args:
+        name (str): Name of the step, e.g. "parse" or "store"
+    """
+    timings: dict[str, float] | None = _timings.get()
+    if timings is None:
+        yield
+        return
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+class RequestTimings:
+    """Durations of the spans of all requests served since startup"""
+
+    def __init__(self) -> None:
+        self.totals: Counter[str] = Counter()
+        self.requests: int = 0
+
+    def record(self, timings: dict[str, float]) -> None:
+        self.totals.update(timings)
+        self.requests += 1
+
+    def summary(self) -> dict[str, float]:
+        """Average duration of each span, in milliseconds"""
+        if not self.requests:
+            return {}
+        return {
+            name: total * 1000 / self.requests
+            for name, total in self.totals.items()
+        }
+
+
+class TimingMiddleware:
+    """ASGI middleware timing requests.
+
+    Spans recorded while serving a request are returned in a 'Server-Timing'
+    header. Time not spent in a span is reported as "serialize", as it is
+    mostly spent by FastAPI validating and encoding the returned models.
+    The time to send the body cannot be part of the headers, so it is only
+    recorded in RequestTimings along with the other spans.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        profiler: SamplingProfiler,
+        request_timings: RequestTimings,
+        server_timing: bool,
+    ):
+        self.app = app
+        self.profiler: SamplingProfiler = profiler
+        self.request_timings: RequestTimings = request_timings
+        self.server_timing: bool = server_timing
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, float] = {}
+        token = _timings.set(timings)
+        start: float = time.perf_counter()
+        sent: float = start
+
+        async def timed_send(message: Any) -> None:
+            nonlocal sent
+            if message["type"] == "http.response.start":
+                sent = time.perf_counter()
+                if "serialize" not in timings:
+                    remainder = sent - start - sum(timings.values())
+                    timings["serialize"] = max(remainder, 0.0)
+                timings["total"] = sent - start
+                if self.server_timing:
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", server_timing(timings).encode())
+                    ]
+            await send(message)
+
+        self.profiler.active_requests += 1
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            self.profiler.active_requests -= 1
+            _timings.reset(token)
+        timings["send"] = time.perf_counter() - sent
+        self.request_timings.record(timings)
+
+
+def server_timing(timings: dict[str, float]) -> str:
+    """Format durations as the value of a 'Server-Timing' header
+
+    Args:
+        timings (dict[str, float]): Duration of each span, in seconds
+
+    Returns:
+        str: e.g. "parse;dur=0.052, store;dur=0.011"
+    """
+    return ", ".join(
+        f"{name};dur={duration * 1000:.3f}" for name, duration in timings.items()
+    )
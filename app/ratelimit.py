@@ -0,0 +1,200 @@
+"""Per-client rate limiting of the article endpoints with token buckets.
+
+Each client owns a bucket refilled at a constant rate up to a maximal burst.
+A request takes as many tokens as its route costs, e.g. listing all
+articles costs more than reading one. Buckets live in a table of fixed size,
+least recently used first: a bucket is never refilled by a timer, but
+computed again from the elapsed time when its client comes back.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Collection
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBuckets:
+    """Fixed-size table of token buckets, one per client"""
+
+    def __init__(self, rate: float, burst: float, size: int = 65536):
+        """
+        Args:
+            rate (float): Tokens given back to each client per second
+            burst (float): Maximal number of tokens of a client
+            size (int, optional): Maximal number of clients tracked at once.
+                The least recently seen client is forgotten when reached.
+                Defaults to 65536.
+        """
+        if rate <= 0 or burst <= 0 or size < 1:
+            raise ValueError(
+                f"Rate, burst and size must be positive, got "
+                f"{rate}, {burst} and {size}"
+            )
+        self.rate: float = rate
+        self.burst: float = burst
+        self.size: int = size
+        # [tokens, time of last refill] of each client
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self.allowed: int = 0
+        self.throttled: int = 0
+        # Clients forgotten while their bucket was not full yet
+        self.evicted: int = 0
+
+    def take(
+        self, client: str, cost: float, now: float | None = None
+    ) -> float:
+        """Take tokens from the bucket of a client if it holds enough
+
+        Args:
+            client (str): Key of the client
+            cost (float): Number of tokens to take
+            now (float | None, optional): Value of time.monotonic().
+                Defaults to None, i.e. the current one.
+
+        Returns:
+            float: 0 if the tokens were taken. Otherwise, the time to wait
+            until the bucket holds enough tokens, in seconds.
+        """
+        if now is None:
+            now = time.monotonic()
+        bucket: list[float] | None = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.size:
+                self._evict(now)
+            bucket = self._buckets[client] = [self.burst, now]
+        else:
+            self._buckets.move_to_end(client)
+            refill: float = (now - bucket[1]) * self.rate
+            bucket[0] = min(self.burst, bucket[0] + refill)
+            bucket[1] = now
+        if bucket[0] < cost:
+            self.throttled += 1
+            return (cost - bucket[0]) / self.rate
+        bucket[0] -= cost
+        self.allowed += 1
+        return 0.0
+
+    def _evict(self, now: float) -> None:
+        """Forget the least recently seen client. Its bucket is most likely
+        full again, in which case forgetting it changes nothing.
+        """
+        _, (tokens, last) = self._buckets.popitem(last=False)
+        if tokens + (now - last) * self.rate < self.burst:
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "size": self.size,
+            "clients": len(self._buckets),
+            "allowed": self.allowed,
+            "throttled": self.throttled,
+            "evicted": self.evicted,
+        }
+
+
+def client_key(scope: Any, api_keys: Collection[str] = ()) -> str:
+    """Key of the client sending a request: its API key if a valid one is
+    provided, otherwise its IP address. Unknown keys are ignored, or a client
+    could get a fresh bucket by sending a new key with each request.
+
+    Args:
+        scope (Any): ASGI scope of the request
+        api_keys (Collection[str], optional): Valid API keys.
+            Defaults to none.
+
+    Returns:
+        str: e.g. "key:abc" or "ip:127.0.0.1"
+    """
+    for name, value in scope["headers"]:
+        if name == b"x-api-key":
+            key: str = value.decode("latin-1")
+            if key in api_keys:
+                return "key:" + key
+            break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def route_cost(method: str, path: str, list_cost: float) -> float:
+    """Number of tokens a request costs
+
+    Args:
+        method (str): HTTP method
+        path (str): Path of the request
+        list_cost (float): Cost of listing all articles
+
+    Returns:
+        float: list_cost for the listing, 1 for other article endpoints,
+        0 for the others, e.g. admin endpoints, which are not limited.
+    """
+    if not path.startswith("/articles"):
+        return 0.0
+    if method == "GET" and path.rstrip("/") == "/articles":
+        return list_cost
+    return 1.0
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 to clients which ran out of tokens"""
+
+    def __init__(
+        self,
+        app: Any,
+        buckets: TokenBuckets,
+        list_cost: float,
+        api_keys: Collection[str] = frozenset(),
+    ):
+        """
+        Args:
+            app (Any): ASGI app
+            buckets (TokenBuckets): Buckets of the clients
+            list_cost (float): Tokens taken by listing all articles
+            api_keys (Collection[str], optional): API keys clients are
+                limited by, the others being limited by IP address.
+                Defaults to none.
+
+        Raises:
+            ValueError: If listing costs more than a full bucket.
+        """
+        if list_cost > buckets.burst:
+            raise ValueError(
+                f"Listing costs {list_cost} tokens, more than a full bucket"
+            )
+        self.app = app
+        self.buckets: TokenBuckets = buckets
+        self.list_cost: float = list_cost
+        self.api_keys: Collection[str] = api_keys
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            cost = route_cost(scope["method"], scope["path"], self.list_cost)
+            if cost:
+                client: str = client_key(scope, self.api_keys)
+                wait: float = self.buckets.take(client, cost)
+                if wait:
+                    logger.debug(f"Throttled {client} for {wait:.3f}s")
+                    await _too_many_requests(send, wait)
+                    return
+        await self.app(scope, receive, send)
+
+
+async def _too_many_requests(send: Any, wait: float) -> None:
+    body: bytes = b'{"detail":"Too many requests"}'
+    headers: list[tuple[bytes, bytes]] = [
+        # Retry-After only accepts whole seconds
+        (b"retry-after", str(math.ceil(wait)).encode()),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    await send(
+        {"type": "http.response.start", "status": 429, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
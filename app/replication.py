@@ -0,0 +1,271 @@
+"""Read-only follower mode.
+
+A follower rebuilds its storage by tailing the journal of a primary, and
+serves reads from this local copy. Writes are either forwarded to the
+primary or rejected.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from app.articles import apply_records, clear
+from app.journal import read
+
+logger = logging.getLogger(__name__)
+
+# Methods which never modify articles, hence served by followers
+_READ_METHODS: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+# Maximal number of mutations whose dates are converted at once
+_BATCH_SIZE: int = 1024
+
+
+class Follower:
+    """Thread applying the mutations appended to the journal of a primary"""
+
+    def __init__(self, path: str, interval: float = 0.05):
+        """
+        Args:
+            path (str): Path of the journal of the primary
+            interval (float, optional): Time between two checks for new
+                mutations, in seconds. Defaults to 0.05.
+        """
+        self.path: str = path
+        self.interval: float = interval
+        self.offset: int = 0
+        # Position and content of the last applied mutation, which must
+        # still end at 'offset' for the journal to be read from there
+        self._last: tuple[int, dict[str, Any]] | None = None
+        # Position of a mutation which cannot be read even from scratch
+        self._unreadable_at: int | None = None
+        self.records: int = 0
+        # Time at which the primary wrote the last applied mutation
+        self.last_record_time: float | None = None
+        # Time between the write and the application of that mutation
+        self.last_lag: float = 0.0
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def catch_up(self) -> int:
+        """Apply the mutations appended since the last call.
+
+        Mutations are applied as soon as written, before the primary synced
+        them. If it then fails to, it truncates them away and writes the next
+        ones in their place: the storage is then rebuilt from scratch.
+
+        Raises:
+            ValueError: If the journal cannot be read, even from scratch.
+
+        Returns:
+            int: Number of applied mutations
+        """
+        try:
+            size: int = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        if size < self.offset or not self._resumes_after_last():
+            # Journal was truncated, rewritten or replaced
+            logger.warning(f"Journal {self.path} was rewritten, replaying it")
+            self._reset()
+        try:
+            return self._apply_new()
+        except ValueError:
+            if self.offset == self._unreadable_at:
+                raise
+            logger.warning(f"Cannot read journal {self.path}, replaying it")
+            self._reset()
+            try:
+                return self._apply_new()
+            except ValueError:
+                # Not replayed again until the journal changes
+                self._unreadable_at = self.offset
+                raise
+
+    def _resumes_after_last(self) -> bool:
+        """Whether the last applied mutation is still in the journal, just
+        before the position reading resumes from
+        """
+        if self._last is None:
+            return True
+        start, last = self._last
+        try:
+            for record, end in read(self.path, start):
+                return end == self.offset and record == last
+        except ValueError:
+            # 'start' is no longer the beginning of a line
+            pass
+        return False
+
+    def _reset(self) -> None:
+        clear()
+        self.offset = 0
+        self._last = None
+        self._unreadable_at = None
+
+    def _apply_new(self) -> int:
+        applied: int = 0
+        batch: list[dict[str, Any]] = []
+        start: int = self.offset
+        end: int = self.offset
+        try:
+            for record, offset in read(self.path, self.offset):
+                batch.append(record)
+                start, end = end, offset
+                if len(batch) == _BATCH_SIZE:
+                    applied += self._apply(batch, start, end)
+                    batch = []
+        finally:
+            # Mutations read before an unreadable one are applied anyway
+            if batch:
+                applied += self._apply(batch, start, end)
+        if applied:
+            if self.last_record_time is not None:
+                self.last_lag = time.time() - self.last_record_time
+            logger.debug(f"Applied {applied} mutations from {self.path}")
+        return applied
+
+    def _apply(self, batch: list[dict[str, Any]], start: int, end: int) -> int:
+        """Apply mutations, the last one being between 'start' and 'end'"""
+        apply_records(batch)
+        self.offset = end
+        self._last = (start, batch[-1])
+        self.last_record_time = batch[-1].get("ts")
+        self.records += len(batch)
+        return len(batch)
+
+    def metrics(self) -> dict[str, Any]:
+        """Replication progress and lag
+
+        Returns:
+            dict[str, Any]: Bytes of journal not applied yet, and the lag in
+            seconds. Once caught up, the lag is the one of the last applied
+            mutation. Otherwise, it is the age of that mutation.
+        """
+        try:
+            behind: int = max(os.path.getsize(self.path) - self.offset, 0)
+        except FileNotFoundError:
+            behind = 0
+        lag: float = self.last_lag
+        if behind and self.last_record_time is not None:
+            lag = time.time() - self.last_record_time
+        return {
+            "journal": self.path,
+            "offset": self.offset,
+            "bytes_behind": behind,
+            "records_applied": self.records,
+            "last_record_time": self.last_record_time,
+            "lag_seconds": lag,
+            "caught_up": behind == 0,
+        }
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="follower", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Following journal {self.path}")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.catch_up()
+            except Exception as e:
+                logger.error(f"Could not apply mutations: {e}")
+
+
+class ReadOnlyMiddleware:
+    """ASGI middleware of followers, forwarding writes of articles to the
+    primary if its URL is known, rejecting them with 405 otherwise.
+    """
+
+    def __init__(self, app: Any, primary_url: str | None = None):
+        self.app = app
+        self.primary_url: str | None = (
+            primary_url.rstrip("/") if primary_url else None
+        )
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in _READ_METHODS
+            or not scope["path"].startswith("/articles")
+        ):
+            await self.app(scope, receive, send)
+        elif self.primary_url is None:
+            await _respond(
+                send,
+                405,
+                b'{"detail":"Follower is read-only"}',
+                [(b"allow", b"GET, HEAD, OPTIONS")],
+            )
+        else:
+            await self._forward(scope, receive, send)
+
+    async def _forward(self, scope: Any, receive: Any, send: Any) -> None:
+        # Only needed by followers forwarding writes
+        import httpx
+
+        body: bytes = b""
+        more_body: bool = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        url: str = self.primary_url + scope["path"]  # type: ignore
+        if scope["query_string"]:
+            url += "?" + scope["query_string"].decode()
+        headers = [(k, v) for k, v in scope["headers"] if k != b"host"]
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.request(
+                    scope["method"], url, headers=headers, content=body
+                )
+        except httpx.HTTPError as he:
+            logger.error(f"Could not forward to primary: {he}")
+            await _respond(send, 502, b'{"detail":"Primary is unreachable"}')
+            return
+        # Body is already decoded and buffered by httpx
+        excluded = {
+            "content-length",
+            "content-encoding",
+            "transfer-encoding",
+            "connection",
+        }
+        await _respond(
+            send,
+            response.status_code,
+            response.content,
+            [
+                (k.encode(), v.encode())
+                for k, v in response.headers.items()
+                if k.lower() not in excluded
+            ],
+        )
+
+
+async def _respond(
+    send: Any,
+    status: int,
+    body: bytes,
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> None:
+    headers = list(headers or [])
+    if not any(name.lower() == b"content-type" for name, _ in headers):
+        headers.append((b"content-type", b"application/json"))
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send(
+        {"type": "http.response.start", "status": status, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -1,18 +1,260 @@
 """Endpoints of the API"""
 
 import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable
 
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 
-from app.articles import (RequestArticle, ResponseArticle, create, get_all,
-                          get_by_id, update)
-from app.exceptions import ArticleNotFoundError, InvalidRequestedIdError
+from app import config
+from app.articles import (RequestArticle, ResponseArticle, apply_patch,
+                          apply_records, content_metrics, create, delete,
+                          find_by_id, get_all, get_by_id, is_sharded,
+                          list_articles, map_articles, set_journal,
+                          set_storage, update)
+from app.exceptions import (ArticleNotFoundError, InvalidArticleBodyError,
+                            InvalidPatchError, InvalidRequestedIdError,
+                            JournalError)
+from app.profiling import span
+from app.serialization import (EncodedJSONResponse, SerializationEngine,
+                               get_engine)
+from app.startup import WarmupMiddleware, report
+from app.summary import ArticleStats, SummaryCache
+
+if TYPE_CHECKING:
+    from app.compaction import Compactor
+    from app.journal import Journal
+    from app.replication import Follower
+
+# Optional subsystems are only imported when enabled, to start faster
 
 logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
 
+def _expose_metrics(name: str, source: Callable[[], dict[str, Any]]) -> None:
+    """Serve the metrics of a subsystem in /admin/metrics, if enabled"""
+    if config.ADMIN:
+        from app import admin
+
+        admin.metrics_sources[name] = source
+
+
+if config.ADMIN or config.SERVER_TIMING:
+    from app import admin
+    from app.profiling import TimingMiddleware
+
+    app.add_middleware(
+        TimingMiddleware,
+        profiler=admin.profiler,
+        request_timings=admin.request_timings,
+        server_timing=config.SERVER_TIMING,
+    )
+if config.ADMIN:
+    if not config.ADMIN_TOKEN:
+        raise ValueError("BLOG_API_ADMIN requires BLOG_API_ADMIN_TOKEN")
+    app.include_router(admin.router)
+    _expose_metrics("contents", content_metrics)
+if config.FOLLOW_JOURNAL:
+    from app.replication import ReadOnlyMiddleware
+
+    app.add_middleware(ReadOnlyMiddleware, primary_url=config.PRIMARY_URL)
+if config.BACKGROUND_WARMUP:
+    app.add_middleware(WarmupMiddleware, report=report)
+if config.RATE_LIMIT:
+    from app.ratelimit import RateLimitMiddleware, TokenBuckets
+
+    # Added last so throttled requests are rejected before any other work
+    buckets = TokenBuckets(
+        config.RATE_LIMIT, config.RATE_LIMIT_BURST, config.RATE_LIMIT_CLIENTS
+    )
+    app.add_middleware(
+        RateLimitMiddleware,
+        buckets=buckets,
+        list_cost=config.RATE_LIMIT_LIST_COST,
+        api_keys=config.RATE_LIMIT_API_KEYS,
+    )
+    _expose_metrics("rate_limit", buckets.metrics)
+
+engine: SerializationEngine = get_engine(config.SERIALIZER)
+
+summary: SummaryCache = SummaryCache(latest=config.STATS_LATEST)
+
+compactor: "Compactor | None" = None
+journal: "Journal | None" = None
+follower: "Follower | None" = None
+
+# Bodies are parsed by the engine, so their schema must be given to OpenAPI
+_article_body: dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": RequestArticle.schema()}},
+    }
+}
+
+_patch_body: dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/merge-patch+json": {"schema": {"type": "object"}}
+        },
+    }
+}
+
+
+async def article_body(request: Request) -> RequestArticle:
+    """Dependency parsing the body of a request with the serialization engine
+
+    Args:
+        request (Request): Incoming request
+
+    Raises:
+        HTTPException: Returns 422 if body is not a valid article
+
+    Returns:
+        RequestArticle: Parsed article
+    """
+    raw: bytes = await request.body()
+    try:
+        with span("parse"):
+            return engine.decode_article(raw)
+    except InvalidArticleBodyError as iabe:
+        raise HTTPException(status_code=422, detail=iabe.detail)
+
+
+async def patch_body(request: Request) -> dict[str, Any]:
+    """Dependency parsing the body of a request as a JSON Merge Patch
+
+    Args:
+        request (Request): Incoming request
+
+    Raises:
+        HTTPException: Returns 422 if body is not a JSON object
+
+    Returns:
+        dict[str, Any]: Parsed patch
+    """
+    raw: bytes = await request.body()
+    try:
+        with span("parse"):
+            return engine.decode_patch(raw)
+    except InvalidArticleBodyError as iabe:
+        raise HTTPException(status_code=422, detail=iabe.detail)
+
+
+@app.on_event("startup")
+def start_background_tasks() -> None:
+    """Warm the storage up, in the background if configured so. The app is
+    then alive as soon as it serves requests, and ready once warm.
+    """
+    if config.BACKGROUND_WARMUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        warm_up()
+
+
+def warm_up() -> None:
+    """Set up storage and background tasks according to configuration.
+    Tombstones only exist, hence need compaction, with soft deletion.
+    """
+    try:
+        _set_up_storage()
+    except Exception as e:
+        report.set_failed(e)
+        if not config.BACKGROUND_WARMUP:
+            raise
+        return
+    report.set_ready()
+
+
+def _set_up_storage() -> None:
+    global compactor, journal, follower
+    if config.SHARDS:
+        with report.phase("start shards"):
+            from app.sharding import ShardedStore
+
+            set_storage(ShardedStore(config.SHARDS))
+    if config.FOLLOW_JOURNAL:
+        from app.replication import Follower
+
+        # Followers never write: mutations, purges included, come from the
+        # primary's journal
+        with report.phase("catch up"):
+            follower = Follower(config.FOLLOW_JOURNAL, config.FOLLOW_INTERVAL)
+            follower.catch_up()
+        follower.start()
+        _expose_metrics("replication", follower.metrics)
+        return
+    if config.JOURNAL_PATH:
+        from app.journal import Journal, read_batches
+
+        with report.phase("replay journal"):
+            if os.path.exists(config.JOURNAL_PATH):
+                for records, _ in read_batches(config.JOURNAL_PATH):
+                    apply_records(records)
+        journal = Journal(
+            config.JOURNAL_PATH,
+            max_batch=config.JOURNAL_MAX_BATCH,
+            max_delay=config.JOURNAL_MAX_DELAY,
+            queue_size=config.JOURNAL_QUEUE_SIZE,
+        )
+        set_journal(journal)
+        _expose_metrics("journal", journal.metrics)
+    if config.SOFT_DELETE:
+        from app.compaction import Compactor
+
+        compactor = Compactor(
+            interval=config.COMPACTION_INTERVAL,
+            budget=config.COMPACTION_BUDGET,
+            ttl=config.TOMBSTONE_TTL,
+        )
+        compactor.start()
+
+
+@app.on_event("shutdown")
+def stop_background_tasks() -> None:
+    if compactor is not None:
+        compactor.stop()
+    if config.ADMIN:
+        admin.profiler.stop()
+    if follower is not None:
+        follower.stop()
+    if journal is not None:
+        set_journal(None)
+        journal.close()
+    if is_sharded():
+        storage = set_storage({})
+        storage.close()  # type: ignore
+
+
+@app.exception_handler(JournalError)
+def journal_error_handler(request: Request, je: JournalError) -> JSONResponse:
+    """Mutations which are not durable must not be acknowledged"""
+    return JSONResponse(status_code=503, content={"detail": je.message})
+
+
+@app.get("/healthz")
+def get_health() -> dict[str, str]:
+    """Liveness probe: the app serves requests, articles may not be loaded"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def get_readiness() -> JSONResponse:
+    """Readiness probe: the storage is warm, so articles can be served.
+    Also reports the duration of each phase of startup.
+
+    Returns:
+        JSONResponse: 200 once ready, 503 before
+    """
+    return JSONResponse(
+        status_code=200 if report.ready else 503, content=report.as_dict()
+    )
+
+
 @app.get("/")
 def hello_world():
     """Dummy function returning an "Hello World!" message
@@ -24,20 +266,45 @@ def hello_world():
     return {"message": "Hello World!"}
 
 
-@app.get("/articles")
-def get_all_articles() -> list[ResponseArticle]:
+@app.get("/articles", response_model=list[ResponseArticle])
+def get_all_articles() -> list[ResponseArticle] | Response:
     """Get all articles
 
     Returns:
-        list[ResponseArticle]: The list of articles to return
+        list[ResponseArticle] | Response: The list of articles to return,
+        already encoded if the serialization engine encodes articles itself
     """
-    articles = get_all()
+    if engine.encodes_articles and is_sharded():
+        # Shard processes encode their own articles, in parallel
+        with span("serialize"):
+            encoded = map_articles(engine.encode_article)
+        return engine.encoded_articles_response(encoded)
+    if engine.encodes_articles:
+        with span("store"):
+            raw_articles = list_articles()
+        with span("serialize"):
+            return engine.articles_response(raw_articles)
+    with span("store"):
+        articles = get_all()
     logger.debug(f"Returning {len(articles)} articles")
     return articles
 
 
-@app.get("/articles/{article_id}")
-def get_article(article_id: str) -> ResponseArticle:
+@app.get("/articles/stats", response_model=ArticleStats)
+def get_article_stats() -> Response:
+    """Number of articles and the most recently created ones, without their
+    content. Only computed again once articles changed.
+
+    Returns:
+        Response: Already encoded ArticleStats
+    """
+    with span("store"):
+        encoded = summary.encoded()
+    return EncodedJSONResponse(encoded)
+
+
+@app.get("/articles/{article_id}", response_model=ResponseArticle)
+def get_article(article_id: str) -> ResponseArticle | Response:
     """Get one article according to given Id
 
     Args:
@@ -47,11 +314,18 @@ def get_article(article_id: str) -> ResponseArticle:
         HTTPException: Returns 400 if article Id is invalid. Returns 404 if article is not found
 
     Returns:
-        ResponseArticle: Requested article
+        ResponseArticle | Response: Requested article, already encoded if the
+        serialization engine encodes articles itself
     """
     logger.debug(f"Looking for article with id {article_id}")
     try:
-        article = get_by_id(article_id)
+        if engine.encodes_articles:
+            with span("store"):
+                raw_article = find_by_id(article_id)
+            with span("serialize"):
+                return engine.article_response(raw_article)
+        with span("store"):
+            article = get_by_id(article_id)
     except InvalidRequestedIdError as irie:
         raise HTTPException(status_code=400, detail=irie.message)
     except ArticleNotFoundError as anfe:
@@ -63,24 +337,31 @@ def get_article(article_id: str) -> ResponseArticle:
     return article
 
 
-@app.post("/articles", status_code=201)
-def new_article(article: RequestArticle, response: Response) -> None:
+@app.post("/articles", status_code=201, openapi_extra=_article_body)
+def new_article(
+    response: Response, article: RequestArticle = Depends(article_body)
+) -> None:
     """Create a new article
 
     Args:
         article (RequestArticle): Article to create
     """
     logger.info("Creating article...")
-    article_id = create(article)
+    with span("store"):
+        article_id = create(article)
     # New created article's Id must be returned for consumer to re-access later
     article_location: str = "/articles/%s" % article_id
     response.headers["Location"] = article_location
     logger.debug(f"Location header: {article_location}")
 
 
-@app.put("/articles/{article_id}", status_code=204)
+@app.put(
+    "/articles/{article_id}", status_code=204, openapi_extra=_article_body
+)
 def update_article(
-    article_id: str, article: RequestArticle, response: Response
+    article_id: str,
+    response: Response,
+    article: RequestArticle = Depends(article_body),
 ) -> None:
     """Update an article
     The article is updated if it already exists
@@ -92,7 +373,54 @@ def update_article(
         response (Response): Arg provided by FastAPI to edit HTTP code
     """
     try:
-        update(article_id, article)
+        with span("store"):
+            update(article_id, article)
+    except InvalidRequestedIdError as irie:
+        raise HTTPException(status_code=400, detail=irie.message)
+    except ArticleNotFoundError as anfe:
+        raise HTTPException(status_code=404, detail=anfe.message)
+
+
+@app.patch(
+    "/articles/{article_id}", status_code=204, openapi_extra=_patch_body
+)
+def patch_article(
+    article_id: str, changes: dict[str, Any] = Depends(patch_body)
+) -> None:
+    """Partially update an article with a JSON Merge Patch (RFC 7396)
+    Only the members present in the patch are modified
+
+    Args:
+        article_id (str): Id of the requested article to patch
+        changes (dict[str, Any]): Members to modify and their new values
+
+    Raises:
+        HTTPException: Returns 400 if article Id is invalid. Returns 404 if article is not found. Returns 422 if patch is invalid
+    """
+    try:
+        with span("store"):
+            apply_patch(article_id, changes)
+    except InvalidRequestedIdError as irie:
+        raise HTTPException(status_code=400, detail=irie.message)
+    except ArticleNotFoundError as anfe:
+        raise HTTPException(status_code=404, detail=anfe.message)
+    except InvalidPatchError as ipe:
+        raise HTTPException(status_code=422, detail=ipe.detail)
+
+
+@app.delete("/articles/{article_id}", status_code=204)
+def delete_article(article_id: str) -> None:
+    """Delete an article
+
+    Args:
+        article_id (str): Id of the requested article to delete
+
+    Raises:
+        HTTPException: Returns 400 if article Id is invalid. Returns 404 if article is not found
+    """
+    try:
+        with span("store"):
+            delete(article_id)
     except InvalidRequestedIdError as irie:
         raise HTTPException(status_code=400, detail=irie.message)
     except ArticleNotFoundError as anfe:
@@ -0,0 +1,247 @@
+"""Engines converting articles from and to the bytes exchanged with consumers.
+
+The default engine keeps FastAPI's behaviour: routes return pydantic models
+which are validated and encoded by 'jsonable_encoder'. The "orjson" engine
+skips the pydantic models entirely and encodes Article objects straight to
+bytes.
+"""
+
+import json
+import logging
+from typing import Any, Iterable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import HTTPException, RequestValidationError
+from fastapi.responses import Response
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import DictError, MissingError
+
+from app.articles import Article, RequestArticle, ResponseArticle
+from app.exceptions import InvalidArticleBodyError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class SerializationEngine:
+    """Default engine, relying on pydantic models and jsonable_encoder"""
+
+    name: str = "pydantic"
+    # If True, routes hand Article objects to the engine and return its
+    # responses as is. Otherwise, they return pydantic models to FastAPI.
+    encodes_articles: bool = False
+
+    def decode_article(self, raw: bytes) -> RequestArticle:
+        """Parse the body of a request into a RequestArticle
+
+        Args:
+            raw (bytes): Body of the request
+
+        Raises:
+            RequestValidationError: If body is not a valid article. Errors
+                are the ones FastAPI reports when parsing the body itself.
+            HTTPException: Returns 400 if body cannot be decoded at all, e.g.
+                if it is not valid UTF-8, as FastAPI does.
+
+        Returns:
+            RequestArticle: Parsed article
+        """
+        if not raw:
+            raise RequestValidationError(
+                [ErrorWrapper(MissingError(), loc=("body",))], body=None
+            )
+        try:
+            fields: Any = self._loads(raw)
+        except json.JSONDecodeError as jde:
+            raise RequestValidationError(
+                [ErrorWrapper(jde, loc=("body", jde.pos))], body=jde.doc
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="There was an error parsing the body"
+            )
+        if not isinstance(fields, dict):
+            raise RequestValidationError(
+                [ErrorWrapper(DictError(), loc=("body",))], body=fields
+            )
+        return self._validate(fields)
+
+    def _loads(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+    def _validate(self, fields: dict[str, Any]) -> RequestArticle:
+        """Validate the members of a body with the pydantic model
+
+        Raises:
+            RequestValidationError: If a member is missing or invalid
+        """
+        try:
+            return RequestArticle.parse_obj(fields)
+        except ValidationError as ve:
+            # Errors of members are located within the body
+            raise RequestValidationError(
+                [ErrorWrapper(ve, loc=("body",))], body=fields
+            )
+
+    def decode_patch(self, raw: bytes) -> dict[str, Any]:
+        """Parse the body of a request into a JSON Merge Patch
+
+        Args:
+            raw (bytes): Body of the request
+
+        Raises:
+            InvalidArticleBodyError: If body is not a JSON object.
+
+        Returns:
+            dict[str, Any]: Parsed patch
+        """
+        try:
+            patch: Any = json.loads(raw)
+        except ValueError as ve:
+            raise InvalidArticleBodyError(str(ve))
+        return _as_patch(patch)
+
+    def encode_article(self, article: Article) -> bytes:
+        """Encode one article the way it is returned to API consumer
+
+        Args:
+            article (Article): Article to encode
+
+        Returns:
+            bytes: JSON document
+        """
+        response: ResponseArticle = ResponseArticle.from_article(article)
+        return json.dumps(jsonable_encoder(response)).encode()
+
+    def encode_articles(self, articles: Iterable[Article]) -> bytes:
+        """Encode a list of articles the way it is returned to API consumer
+
+        Args:
+            articles (Iterable[Article]): Articles to encode
+
+        Returns:
+            bytes: JSON document
+        """
+        responses = [ResponseArticle.from_article(a) for a in articles]
+        return json.dumps(jsonable_encoder(responses)).encode()
+
+    def article_response(self, article: Article) -> Response:
+        return EncodedJSONResponse(self.encode_article(article))
+
+    def articles_response(self, articles: Iterable[Article]) -> Response:
+        return EncodedJSONResponse(self.encode_articles(articles))
+
+    def encoded_articles_response(self, encoded: list[bytes]) -> Response:
+        """Response listing articles encoded one by one by encode_article()
+
+        Args:
+            encoded (list[bytes]): JSON document of each article
+
+        Returns:
+            Response: JSON array of the articles
+        """
+        return EncodedJSONResponse(b"[" + b",".join(encoded) + b"]")
+
+
+class OrjsonEngine(SerializationEngine):
+    """Engine encoding Article objects straight to bytes with orjson"""
+
+    name = "orjson"
+    encodes_articles = True
+
+    def _loads(self, raw: bytes) -> Any:
+        try:
+            return orjson.loads(raw)  # type: ignore
+        except orjson.JSONDecodeError:  # type: ignore
+            # Rare: parsed again so errors are the default engine's ones,
+            # and bodies orjson is stricter about are still accepted
+            return json.loads(raw)
+
+    def _validate(self, fields: dict[str, Any]) -> RequestArticle:
+        title: Any = fields.get("title")
+        content: Any = fields.get("content")
+        if not (
+            isinstance(title, str)
+            and isinstance(content, str)
+            and isinstance(fields.get("creation"), (str, type(None)))
+            and isinstance(fields.get("id"), (str, type(None)))
+        ):
+            # Members to coerce or reject, the way pydantic does
+            return super()._validate(fields)
+        # Members are already strings, skip pydantic's validation
+        return RequestArticle.construct(
+            title=title,
+            content=content,
+            creation=fields.get("creation"),
+            id=fields.get("id"),
+        )
+
+    def decode_patch(self, raw: bytes) -> dict[str, Any]:
+        try:
+            patch: Any = orjson.loads(raw)  # type: ignore
+        except orjson.JSONDecodeError as jde:  # type: ignore
+            raise InvalidArticleBodyError(str(jde))
+        return _as_patch(patch)
+
+    def encode_article(self, article: Article) -> bytes:
+        return orjson.dumps(_as_dict(article))  # type: ignore
+
+    def encode_articles(self, articles: Iterable[Article]) -> bytes:
+        return orjson.dumps([_as_dict(a) for a in articles])  # type: ignore
+
+
+class EncodedJSONResponse(Response):
+    """Response whose content is an already encoded JSON document"""
+
+    media_type = "application/json"
+
+
+def _as_patch(patch: Any) -> dict[str, Any]:
+    """A merge patch which is not an object would replace the whole article"""
+    if not isinstance(patch, dict):
+        raise InvalidArticleBodyError("Patch must be a JSON object")
+    return patch
+
+
+def _as_dict(article: Article) -> dict[str, Any]:
+    """Fields of an article, in the order of ResponseArticle.
+    orjson natively encodes UUID objects.
+    """
+    return {
+        "title": article.title,
+        "content": article.content,
+        "creation": article.creation,
+        "id": article.id.uuid,
+    }
+
+
+_engines: dict[str, type[SerializationEngine]] = {
+    SerializationEngine.name: SerializationEngine,
+    OrjsonEngine.name: OrjsonEngine,
+}
+
+
+def get_engine(name: str) -> SerializationEngine:
+    """Instantiate the serialization engine with the given name
+
+    Args:
+        name (str): Name of the engine ("pydantic" or "orjson")
+
+    Raises:
+        ValueError: If no engine has this name.
+
+    Returns:
+        SerializationEngine: The engine, or the default one if the requested
+        engine depends on a package which is not installed.
+    """
+    if name not in _engines:
+        raise ValueError(f"Unknown serialization engine '{name}'")
+    if name == OrjsonEngine.name and orjson is None:
+        logger.warning("orjson is not installed, using default engine")
+        return SerializationEngine()
+    return _engines[name]()
@@ -0,0 +1,237 @@
+"""Storage whose keyspace is split across worker processes.
+
+Keys are Ids holding a UUID. The UUID space is cut into as many contiguous
+ranges as there are shards, each one owned by a worker process. Point
+operations are sent to the owning shard only. Operations over the whole
+storage are sent to every shard at once and their results are merged back
+in insertion order, so the storage behaves like a dict.
+"""
+
+import heapq
+import logging
+import multiprocessing
+import threading
+from itertools import count
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Iterator, MutableMapping
+
+logger = logging.getLogger(__name__)
+
+
+def _set(data: dict, key: Any, seq: int, value: Any) -> None:
+    # Like a dict, replacing a value keeps the position of the key
+    previous = data.get(key)
+    data[key] = (seq if previous is None else previous[0], value)
+
+
+def _get(data: dict, key: Any) -> tuple[bool, Any]:
+    # Missing keys are reported to the router, which raises KeyError
+    entry = data.get(key)
+    return (False, None) if entry is None else (True, entry[1])
+
+
+def _pop(data: dict, key: Any) -> tuple[bool, Any]:
+    entry = data.pop(key, None)
+    return (False, None) if entry is None else (True, entry[1])
+
+
+def _contains(data: dict, key: Any) -> bool:
+    return key in data
+
+
+def _len(data: dict) -> int:
+    return len(data)
+
+
+def _clear(data: dict) -> None:
+    data.clear()
+
+
+def _map(
+    data: dict, func: Callable[[Any, Any], Any]
+) -> list[tuple[int, Any]]:
+    """Apply func to each (key, value) of the shard, dropping None results.
+
+    Returns:
+        list[tuple[int, Any]]: Results along with the insertion sequence
+        number of their key, sorted on the latter
+    """
+    results = []
+    for key, (seq, value) in data.items():
+        result = func(key, value)
+        if result is not None:
+            results.append((seq, result))
+    results.sort(key=lambda item: item[0])
+    return results
+
+
+_OPERATIONS: dict[str, Callable[..., Any]] = {
+    "set": _set,
+    "get": _get,
+    "pop": _pop,
+    "contains": _contains,
+    "len": _len,
+    "clear": _clear,
+    "map": _map,
+}
+
+
+def _serve(connection: Connection) -> None:
+    """Main loop of a shard process, serving operations until closed"""
+    data: dict[Any, tuple[int, Any]] = {}
+    while True:
+        operation, args = connection.recv()
+        if operation == "close":
+            break
+        try:
+            connection.send((True, _OPERATIONS[operation](data, *args)))
+        except Exception as e:
+            connection.send((False, e))
+    connection.close()
+
+
+def _key(key: Any, value: Any) -> Any:
+    return key
+
+
+def _value(key: Any, value: Any) -> Any:
+    return value
+
+
+def _item(key: Any, value: Any) -> Any:
+    return key, value
+
+
+class _Shard:
+    """Worker process owning one range of keys, and the pipe to reach it"""
+
+    def __init__(self, context: Any, index: int):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child,), name=f"shard-{index}", daemon=True
+        )
+        self.process.start()
+        child.close()
+        # Requests from several threads must not interleave on the pipe
+        self.lock: threading.Lock = threading.Lock()
+
+    def send(self, operation: str, *args: Any) -> None:
+        self.connection.send((operation, args))
+
+    def receive(self) -> Any:
+        ok, result = self.connection.recv()
+        if not ok:
+            raise result
+        return result
+
+    def call(self, operation: str, *args: Any) -> Any:
+        with self.lock:
+            self.send(operation, *args)
+            return self.receive()
+
+
+class ShardedStore(MutableMapping[Any, Any]):
+    """Dict-like storage spread across worker processes"""
+
+    def __init__(self, shards: int):
+        """
+        Args:
+            shards (int): Number of worker processes
+        """
+        if shards < 1:
+            raise ValueError(f"At least one shard is needed, got {shards}")
+        # Forking a process running threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._shards: list[_Shard] = [
+            _Shard(context, index) for index in range(shards)
+        ]
+        # Gives the global insertion order of keys
+        self._sequence: Iterator[int] = count()
+        logger.info(f"Storage split across {shards} shards")
+
+    def _owner(self, key: Any) -> _Shard:
+        # UUIDs are 128 bits long: shard i owns [i, i + 1[ * 2**128 / shards
+        return self._shards[key.uuid.int * len(self._shards) >> 128]
+
+    def _fan_out(self, operation: str, *args: Any) -> list[Any]:
+        """Send an operation to every shard, then gather their results.
+        Shards are locked in a fixed order, so fan-outs cannot deadlock.
+        """
+        for shard in self._shards:
+            shard.lock.acquire()
+        try:
+            for shard in self._shards:
+                shard.send(operation, *args)
+            return [shard.receive() for shard in self._shards]
+        finally:
+            for shard in self._shards:
+                shard.lock.release()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._owner(key).call("set", key, next(self._sequence), value)
+
+    def __getitem__(self, key: Any) -> Any:
+        found, value = self._owner(key).call("get", key)
+        if not found:
+            raise KeyError(key)
+        return value
+
+    def __delitem__(self, key: Any) -> None:
+        found, _ = self._owner(key).call("pop", key)
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return self._owner(key).call("contains", key)
+
+    def __len__(self) -> int:
+        return sum(self._fan_out("len"))
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.map(_key))
+
+    def __repr__(self) -> str:
+        return f"ShardedStore(shards={len(self._shards)})"
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        found, value = self._owner(key).call("pop", key)
+        if not found:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        return value
+
+    def clear(self) -> None:
+        self._fan_out("clear")
+
+    def keys(self) -> list[Any]:  # type: ignore
+        return self.map(_key)
+
+    def values(self) -> list[Any]:  # type: ignore
+        return self.map(_value)
+
+    def items(self) -> list[tuple[Any, Any]]:  # type: ignore
+        return self.map(_item)
+
+    def map(self, func: Callable[[Any, Any], Any]) -> list[Any]:
+        """Apply func to every (key, value) inside the shard processes, in
+        parallel. Results are merged back in insertion order of the keys.
+
+        Args:
+            func (Callable[[Any, Any], Any]): Picklable function. Its None
+                results are dropped.
+
+        Returns:
+            list[Any]: Results
+        """
+        merged = heapq.merge(*self._fan_out("map", func), key=lambda i: i[0])
+        return [result for _, result in merged]
+
+    def close(self) -> None:
+        """Stop the shard processes, discarding their data"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.send("close")
+            shard.process.join()
+            shard.connection.close()
+        self._shards = []
@@ -0,0 +1,131 @@
+"""Timing of the phases of startup, and readiness of the app.
+
+Imported first by app.main, so it only depends on the standard library and
+can time the imports of everything else.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+def process_age() -> float | None:
+    """Time elapsed since the process started, as seen by the kernel
+
+    Returns:
+        float | None: Age in seconds, with the resolution of a clock tick
+        (usually 10 ms). None if unknown, e.g. outside of Linux.
+    """
+    try:
+        with open("/proc/self/stat") as file:
+            # Process name is within parentheses and may contain spaces
+            fields: list[str] = file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as file:
+            uptime: float = float(file.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    # 'starttime' is the 22nd field, the 20th after the process name
+    started: float = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    return max(uptime - started, 0.0)
+
+
+class StartupReport:
+    """Duration of each phase of startup, and whether the app is ready"""
+
+    def __init__(self) -> None:
+        # Time from process start to the import of the app, e.g. spent by
+        # the interpreter and the server loading
+        age: float | None = process_age()
+        self.phases: dict[str, float] = (
+            {} if age is None else {"before import": age}
+        )
+        self.error: str | None = None
+        self._ready: threading.Event = threading.Event()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the duration of a phase of startup
+
+        Args:
+            name (str): Name of the phase, e.g. "import fastapi"
+        """
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration: float = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def set_ready(self) -> None:
+        """Mark the app as ready to serve articles, and log the report"""
+        self._ready.set()
+        total: float = self.total() * 1000
+        logger.info(f"Ready after {total:.1f}ms: {self.summary()}")
+
+    def set_failed(self, error: BaseException) -> None:
+        """Record why warming up failed. The app then never becomes ready."""
+        self.error = f"{type(error).__name__}: {error}"
+        logger.error(f"Warm-up failed, app will not be ready: {self.error}")
+
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def summary(self) -> dict[str, float]:
+        """Duration of each phase, in milliseconds"""
+        return {
+            name: round(duration * 1000, 3)
+            for name, duration in self.phases.items()
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "phases_ms": self.summary(),
+            "total_ms": round(self.total() * 1000, 3),
+        }
+
+
+report: StartupReport = StartupReport()
+
+
+class WarmupMiddleware:
+    """ASGI middleware answering 503 to article requests until the storage
+    is warm, when it is loaded in the background.
+    """
+
+    def __init__(self, app: Any, report: StartupReport):
+        self.app = app
+        self.report: StartupReport = report
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if (
+            scope["type"] == "http"
+            and not self.report.ready
+            and scope["path"].startswith("/articles")
+        ):
+            body: bytes = b'{"detail":"Articles are still being loaded"}'
+            headers: list[tuple[bytes, bytes]] = [
+                (b"retry-after", b"1"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": headers,
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+        await self.app(scope, receive, send)
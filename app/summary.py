@@ -0,0 +1,97 @@
+"""Summary of the stored articles, polled by dashboards.
+
+The summary is only computed again once the storage version changed, and
+kept already encoded, so polling an unchanged storage never walks it.
+"""
+
+import heapq
+import json
+import logging
+from datetime import datetime, timezone
+
+from pydantic import BaseModel
+
+from app.articles import Article, map_articles, store_version
+
+logger = logging.getLogger(__name__)
+
+_EPOCH: datetime = datetime(1970, 1, 1)
+_UTC_EPOCH: datetime = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Headline(BaseModel):
+    """Article without its content"""
+
+    id: str
+    title: str
+    creation: str
+
+
+class ArticleStats(BaseModel):
+    """Number of articles and the most recently created ones"""
+
+    articles: int
+    version: int
+    latest: list[Headline]
+
+
+def _headline(article: Article) -> tuple[float, str, str, str]:
+    # Module level function, so shard processes can run it. Naive and aware
+    # dates cannot be compared, so articles are sorted by seconds since the
+    # epoch, naive dates being taken as UTC. Unlike datetime.timestamp(),
+    # this never converts from local time, which fails near year 1.
+    date: datetime = article.date
+    epoch: datetime = _EPOCH if date.tzinfo is None else _UTC_EPOCH
+    return (
+        (date - epoch).total_seconds(),
+        article.id.as_str(),
+        article.title,
+        article.creation,
+    )
+
+
+class SummaryCache:
+    """ArticleStats of the storage, encoded once per storage version"""
+
+    def __init__(self, latest: int = 10):
+        """
+        Args:
+            latest (int, optional): Number of most recently created articles
+                to list. Defaults to 10.
+        """
+        self.latest: int = latest
+        self.builds: int = 0
+        # Storage version the encoded summary was computed at
+        self._cached: tuple[int, bytes] | None = None
+
+    def encoded(self) -> bytes:
+        """Summary of the storage, computed again if it changed since
+
+        Returns:
+            bytes: ArticleStats as a JSON document
+        """
+        version: int = store_version()
+        cached = self._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        # Mutations made while building change the version again, so they
+        # cannot be missed by the next call
+        encoded: bytes = self._build(version)
+        self._cached = (version, encoded)
+        return encoded
+
+    def _build(self, version: int) -> bytes:
+        headlines = map_articles(_headline)
+        latest = heapq.nlargest(self.latest, headlines, key=lambda h: h[0])
+        self.builds += 1
+        logger.debug(f"Summary of {len(headlines)} articles built")
+        return json.dumps(
+            {
+                "articles": len(headlines),
+                "version": version,
+                "latest": [
+                    {"id": id, "title": title, "creation": creation}
+                    for _, id, title, creation in latest
+                ],
+            }
+        ).encode()
@@ -1,25 +1,80 @@
 """Utility functions"""
 
 from datetime import datetime
+from typing import Iterable
+from uuid import UUID
 
+# Longest form accepted by UUID(): "urn:uuid:" followed by the canonical form
+_UUID_MAX_LENGTH: int = len("urn:uuid:") + 36
 
-def iso_string_to_datetime(iso_string: str | None) -> datetime:
+
+def string_to_uuid(id: str) -> UUID | None:
+    """Convert a string into a UUID object without raising any exception
+
+    Args:
+        id (str): String to convert
+
+    Returns:
+        UUID | None: UUID object, None if the string is not a valid UUID.
+    """
+    # Any UUID holds 32 hexadecimal digits. Checking the length first spares
+    # raising an exception for most invalid Ids, without slowing valid ones.
+    if not 32 <= len(id) <= _UUID_MAX_LENGTH:
+        return None
+    try:
+        return UUID(id)
+    except ValueError:
+        return None
+
+
+def iso_string_to_datetime(
+    iso_string: str | None, now: datetime | None = None
+) -> datetime:
     """Convert date from ISO format to datetime object
 
     Args:
         iso_string (str | None): String to convert
+        now (datetime | None, optional): Date returned if string cannot be
+            converted. Defaults to the current date.
 
     Returns:
         datetime: Datetime object. It corresponds to now if an error occured.
     """
-    date: datetime = datetime.now()
-    if iso_string:
+    # Any string accepted by datetime.fromisoformat starts with the year
+    if iso_string and iso_string[:4].isdigit():
         try:
-            date = datetime.fromisoformat(iso_string)
+            return datetime.fromisoformat(iso_string)
         except ValueError:
-            # If it cannot be parsed as isoformat, get current date
+            # Looks like an ISO date but is not, e.g. month 13
             pass
-    return date
+    return now or datetime.now()
+
+
+def iso_strings_to_datetimes(
+    iso_strings: Iterable[str | None],
+) -> list[datetime]:
+    """Convert many dates from ISO format to datetime objects at once.
+    Strings which cannot be converted all share the same current date.
+
+    Args:
+        iso_strings (Iterable[str | None]): Strings to convert
+
+    Returns:
+        list[datetime]: Datetime objects, in the same order
+    """
+    now: datetime = datetime.now()
+    # Local names avoid attribute lookups in the loop
+    fromisoformat = datetime.fromisoformat
+    dates: list[datetime] = []
+    for iso_string in iso_strings:
+        if iso_string and iso_string[:4].isdigit():
+            try:
+                dates.append(fromisoformat(iso_string))
+                continue
+            except ValueError:
+                pass
+        dates.append(now)
+    return dates
 
 
 def datetime_to_iso_string(date: datetime) -> str:
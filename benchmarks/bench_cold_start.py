@@ -0,0 +1,98 @@
+"""Time from process start to the first served request, and to readiness.
+
+Starts the app with uvicorn, as deployed, then polls /healthz and /readyz.
+With a journal to replay, warming up in the background makes the app alive
+before the articles are loaded.
+
+Run from the repository root:
+    python -m benchmarks.bench_cold_start
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+RUNS = 3
+RECORDS = 50_000
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, start: float) -> float:
+    while True:
+        try:
+            if httpx.get(url).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.002)
+
+
+def _cold_start(environment: dict[str, str]) -> tuple[float, float, dict]:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env={**os.environ, **environment},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        alive = _wait_for(url + "/healthz", start)
+        ready = _wait_for(url + "/readyz", start)
+        phases = httpx.get(url + "/readyz").json()["phases_ms"]
+    finally:
+        process.terminate()
+        process.wait()
+    return alive, ready, phases
+
+
+def _write_journal(path: str) -> None:
+    with open(path, "w") as file:
+        for index in range(RECORDS):
+            record = {
+                "op": "put",
+                "id": str(uuid.uuid4()),
+                "ts": 0,
+                "title": f"t{index}",
+                "content": "c" * 200,
+                "creation": "2023-01-01T00:00:00",
+            }
+            file.write(json.dumps(record) + "\n")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "journal.jsonl")
+        _write_journal(path)
+        setups = {
+            "empty store": {},
+            f"replay {RECORDS} records": {"BLOG_API_JOURNAL_PATH": path},
+            f"replay {RECORDS} records, background": {
+                "BLOG_API_JOURNAL_PATH": path,
+                "BLOG_API_BACKGROUND_WARMUP": "1",
+            },
+        }
+        print(f"Best of {RUNS} runs, in ms")
+        print(f"{'setup':<36}{'first request':>14}{'ready':>8}")
+        for name, environment in setups.items():
+            runs = [_cold_start(environment) for _ in range(RUNS)]
+            alive, ready, phases = min(runs, key=lambda run: run[1])
+            print(f"{name:<36}{alive * 1000:>14.0f}{ready * 1000:>8.0f}")
+            print(f"    {phases}")
+
+
+if __name__ == "__main__":
+    main()
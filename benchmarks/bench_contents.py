@@ -0,0 +1,57 @@
+"""Memory held by the bodies of a duplicate-heavy corpus, and cost of
+updates which do not change the body.
+
+Run from the repository root:
+    python -m benchmarks.bench_contents
+"""
+
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.articles import Article, _add, _all, _update, clear  # type: ignore
+
+ARTICLES = 10_000
+DISTINCT_BODIES = 100
+BODY_SIZE = 5_000
+UPDATES = 10_000
+
+
+def _body(index: int) -> str:
+    # Built anew each time, like bodies parsed from distinct requests
+    return "".join([str(index % DISTINCT_BODIES).zfill(8)] * (BODY_SIZE // 8))
+
+
+def _memory() -> int:
+    clear()
+    tracemalloc.start()
+    now = datetime.now()
+    for index in range(ARTICLES):
+        _add(Article(_body(index), f"t{index}", now))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def _updates() -> float:
+    old = next(iter(_all.values()))
+    body = old.content
+    start = time.perf_counter()
+    for index in range(UPDATES):
+        new = Article(body, f"t{index}", old.date)
+        _update(old, new)
+        old = new
+    return UPDATES / (time.perf_counter() - start)
+
+
+def main() -> None:
+    size = _memory()
+    print(f"{ARTICLES} articles, {DISTINCT_BODIES} distinct bodies")
+    print(f"Bodies would take {ARTICLES * BODY_SIZE / 2**20:.1f} MiB")
+    print(f"Storage takes     {size / 2**20:.1f} MiB")
+    print(f"Title-only updates: {_updates():,.0f}/s")
+    clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Write throughput of the journal, with and without group commit.
+
+Run from the repository root:
+    python -m benchmarks.bench_journal
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from app.journal import Journal
+
+WRITERS = 32
+RECORDS_PER_WRITER = 100
+RECORD = {"op": "put", "id": "0", "title": "t", "content": "c" * 1000}
+
+
+def _throughput(max_batch: int, max_delay: float) -> tuple[float, dict]:
+    with tempfile.TemporaryDirectory() as directory:
+        journal = Journal(
+            os.path.join(directory, "journal.jsonl"),
+            max_batch=max_batch,
+            max_delay=max_delay,
+        )
+
+        def write() -> None:
+            for _ in range(RECORDS_PER_WRITER):
+                journal.append(RECORD)
+
+        threads = [threading.Thread(target=write) for _ in range(WRITERS)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+        metrics = journal.metrics()
+        journal.close()
+    return WRITERS * RECORDS_PER_WRITER / duration, metrics
+
+
+def main() -> None:
+    print(f"{WRITERS} concurrent writers")
+    print(f"{'max_batch':>10}{'max_delay':>11}{'writes/s':>12}{'mean batch':>12}")
+    for max_batch, max_delay in ((1, 0.0), (32, 0.0), (256, 0.002)):
+        rate, metrics = _throughput(max_batch, max_delay)
+        print(
+            f"{max_batch:>10}{max_delay:>11}{rate:>12,.0f}"
+            f"{metrics['mean_batch_size']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
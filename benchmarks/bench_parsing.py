@@ -0,0 +1,117 @@
+"""Conversion of Ids and dates, compared to the former implementations.
+
+Run from the repository root:
+    python -m benchmarks.bench_parsing
+"""
+
+import timeit
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from app.articles import Article, ResponseArticle
+from app.utils import (iso_string_to_datetime, iso_strings_to_datetimes,
+                       string_to_uuid)
+
+BULK_SIZE = 10_000
+
+
+def former_string_to_uuid(id: str) -> UUID | None:
+    """Former parsing of ArticleId, relying on exceptions"""
+    try:
+        return UUID(id)
+    except ValueError:
+        return None
+
+
+def former_iso_string_to_datetime(iso_string: str | None) -> datetime:
+    """Former iso_string_to_datetime, always calling datetime.now()"""
+    date: datetime = datetime.now()
+    if iso_string:
+        try:
+            date = datetime.fromisoformat(iso_string)
+        except ValueError:
+            pass
+    return date
+
+
+def former_from_article(article: Article) -> ResponseArticle:
+    """Former ResponseArticle.from_article, converting the date each time"""
+    return ResponseArticle(
+        content=article.content,
+        title=article.title,
+        creation=article.date.isoformat(),
+        id=article.id.as_str(),
+    )
+
+
+def _ns_per_call(func, number: int = 1) -> float:
+    count, _ = timeit.Timer(func).autorange()
+    best = min(timeit.repeat(func, number=count, repeat=5))
+    return best / count / number * 1e9
+
+
+def _report(name: str, former, current, number: int = 1) -> None:
+    before = _ns_per_call(former, number)
+    after = _ns_per_call(current, number)
+    print(f"{name:<32}{before:>12,.0f}{after:>12,.0f}{before / after:>9.1f}x")
+
+
+def main() -> None:
+    valid: str = str(uuid4())
+    invalid: str = "not-a-valid-article-id"
+    ids: list[str] = [str(uuid4()) for _ in range(BULK_SIZE)]
+    valid_dates: list[str] = [
+        datetime.fromtimestamp(i * 3600).isoformat() for i in range(BULK_SIZE)
+    ]
+    dates: list[str | None] = [
+        "2023-02-10T16:34:17.942779",
+        "01/01/2023",
+        None,
+        "2023-02-10",
+    ] * (BULK_SIZE // 4)
+    article = Article("c", "t", datetime.now())
+
+    print(f"{'ns per item':<32}{'former':>12}{'current':>12}{'speedup':>10}")
+    _report(
+        "uuid, valid",
+        lambda: former_string_to_uuid(valid),
+        lambda: string_to_uuid(valid),
+    )
+    _report(
+        f"uuids, {BULK_SIZE} distinct",
+        lambda: [former_string_to_uuid(id) for id in ids],
+        lambda: [string_to_uuid(id) for id in ids],
+        number=BULK_SIZE,
+    )
+    _report(
+        "uuid, invalid",
+        lambda: former_string_to_uuid(invalid),
+        lambda: string_to_uuid(invalid),
+    )
+    for sample in ("2023-02-10T16:34:17.942779", "01/01/2023", ""):
+        _report(
+            f"date '{sample}'",
+            lambda: former_iso_string_to_datetime(sample),
+            lambda: iso_string_to_datetime(sample),
+        )
+    _report(
+        f"dates, bulk of {BULK_SIZE}",
+        lambda: [former_iso_string_to_datetime(d) for d in dates],
+        lambda: iso_strings_to_datetimes(dates),
+        number=BULK_SIZE,
+    )
+    _report(
+        f"dates, {BULK_SIZE} valid",
+        lambda: [former_iso_string_to_datetime(d) for d in valid_dates],
+        lambda: [iso_string_to_datetime(d) for d in valid_dates],
+        number=BULK_SIZE,
+    )
+    _report(
+        "from_article",
+        lambda: former_from_article(article),
+        lambda: ResponseArticle.from_article(article),
+    )
+
+
+if __name__ == "__main__":
+    main()
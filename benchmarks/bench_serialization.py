@@ -0,0 +1,56 @@
+"""Throughput of the serialization engines.
+
+Run from the repository root:
+    python -m benchmarks.bench_serialization
+"""
+
+import timeit
+from datetime import datetime
+
+from app.articles import Article, ArticleId
+from app.serialization import OrjsonEngine, SerializationEngine
+
+SIZES = [1, 100, 10_000]
+CONTENT = "Lorem ipsum dolor sit amet. " * 40
+
+
+def _articles(count: int) -> list[Article]:
+    return [
+        Article(CONTENT, f"Title {i}", datetime.now(), ArticleId())
+        for i in range(count)
+    ]
+
+
+def _ops_per_second(func, repeat: int = 5) -> float:
+    number, _ = timeit.Timer(func).autorange()
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return number / best
+
+
+def main() -> None:
+    engines = [SerializationEngine(), OrjsonEngine()]
+    print(f"{'operation':<28}{'engine':<10}{'ops/s':>14}{'articles/s':>14}")
+    for size in SIZES:
+        articles = _articles(size)
+        raw = engines[0].encode_article(articles[0])
+        for engine in engines:
+            if size == 1:
+                rate = _ops_per_second(lambda: engine.decode_article(raw))
+                print(f"{'decode 1':<28}{engine.name:<10}{rate:>14,.0f}")
+                rate = _ops_per_second(
+                    lambda: engine.encode_article(articles[0])
+                )
+                operation = "encode 1"
+            else:
+                rate = _ops_per_second(
+                    lambda: engine.encode_articles(articles)
+                )
+                operation = f"encode list of {size}"
+            print(
+                f"{operation:<28}{engine.name:<10}"
+                f"{rate:>14,.0f}{rate * size:>14,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Encoding of all articles by a single process and by sharded storages.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharding
+"""
+
+import os
+import timeit
+from datetime import datetime
+
+from app.articles import Article, map_articles, set_storage
+from app.serialization import OrjsonEngine, SerializationEngine
+from app.sharding import ShardedStore
+
+ARTICLES = 20_000
+CONTENT = "Lorem ipsum dolor sit amet. " * 40
+
+
+def _fill(storage) -> None:
+    for i in range(ARTICLES):
+        article = Article(CONTENT, f"Title {i}", datetime.now())
+        storage[article.id] = article
+
+
+def _seconds(func) -> float:
+    return min(timeit.repeat(func, number=1, repeat=5))
+
+
+def main() -> None:
+    print(f"Listing {ARTICLES} articles, {os.cpu_count()} CPUs")
+    print(f"{'storage':<12}{'engine':<10}{'ms':>10}")
+    for engine in (SerializationEngine(), OrjsonEngine()):
+        storage: dict = {}
+        _fill(storage)
+        set_storage(storage)
+        duration = _seconds(lambda: map_articles(engine.encode_article))
+        print(f"{'dict':<12}{engine.name:<10}{duration * 1000:>10.1f}")
+        for shards in (2, 4, 8):
+            store = ShardedStore(shards)
+            _fill(store)
+            set_storage(store)
+            duration = _seconds(lambda: map_articles(engine.encode_article))
+            name = f"{shards} shards"
+            print(f"{name:<12}{engine.name:<10}{duration * 1000:>10.1f}")
+            store.close()
+    set_storage({})
+
+
+if __name__ == "__main__":
+    main()
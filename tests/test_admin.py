@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app import admin
+
+app = FastAPI()
+app.include_router(admin.router)
+client = TestClient(app, headers={"X-Admin-Token": "secret"})
+anonymous = TestClient(app)
+
+
+@patch("app.admin.config.ADMIN_TOKEN", "secret")
+class TestAdmin(unittest.TestCase):
+    def tearDown(self) -> None:
+        admin.profiler.stop()
+        admin.memory_tracer.stop()
+        return super().tearDown()
+
+    def test_profiler(self):
+        response: Response = client.post("/admin/profiler/start?interval=0.001")
+        self.assertEqual(204, response.status_code)
+        response = client.post("/admin/profiler/stop")
+        self.assertEqual(204, response.status_code)
+        response = client.get("/admin/profiler/pstats")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("attachment", response.headers["content-disposition"])
+        response = client.get("/admin/profiler/collapsed")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.headers["content-type"].startswith("text/"))
+
+    def test_profiler_rejects_invalid_interval(self):
+        response: Response = client.post("/admin/profiler/start?interval=0")
+        self.assertEqual(422, response.status_code)
+
+    def test_tracemalloc(self):
+        response: Response = client.get("/admin/tracemalloc/top")
+        self.assertEqual(409, response.status_code)
+        response = client.post("/admin/tracemalloc/start")
+        self.assertEqual(204, response.status_code)
+        response = client.get("/admin/tracemalloc/top?limit=3")
+        self.assertEqual(200, response.status_code)
+        self.assertLessEqual(len(response.json()), 3)
+        response = client.get("/admin/tracemalloc/diff?limit=3")
+        self.assertEqual(200, response.status_code)
+
+    def test_timings(self):
+        response: Response = client.get("/admin/timings")
+        self.assertEqual(200, response.status_code)
+
+    def test_token_is_checked(self):
+        response: Response = anonymous.get("/admin/timings")
+        self.assertEqual(403, response.status_code)
+        response = anonymous.get(
+            "/admin/timings", headers={"X-Admin-Token": "wrong"}
+        )
+        self.assertEqual(403, response.status_code)
+        response = client.get("/admin/timings")
+        self.assertEqual(200, response.status_code)
+
+    def test_everything_is_rejected_without_configured_token(self):
+        with patch("app.admin.config.ADMIN_TOKEN", None):
+            response: Response = client.post("/admin/tracemalloc/start")
+        self.assertEqual(403, response.status_code)
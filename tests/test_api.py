@@ -61,3 +61,64 @@ class TestCreateAndGet(TestCase):
         # Assert article has been updated successfully
         self.assertEqual("new title", response_body["title"])
         self.assertEqual("new content", response_body["content"])
+
+    def test_create_and_delete_and_get(self):
+        article = {"title": "a", "content": "b"}
+        response: Response = client.post("/articles", json=article)
+        self.assertEqual(201, response.status_code)
+        location = response.headers["location"]
+        response = client.delete(location)
+        self.assertEqual(204, response.status_code)
+        response = client.get(location)
+        self.assertEqual(404, response.status_code)
+        response = client.delete(location)
+        self.assertEqual(404, response.status_code)
+
+    def test_create_and_patch_and_get(self):
+        article = {"title": "a", "content": "b", "creation": "2023-01-01"}
+        response: Response = client.post("/articles", json=article)
+        location = response.headers["location"]
+        response = client.patch(location, json={"title": "new title"})
+        self.assertEqual(204, response.status_code)
+        response_body = client.get(location).json()
+        self.assertEqual("new title", response_body["title"])
+        self.assertEqual("b", response_body["content"])
+        self.assertEqual("2023-01-01T00:00:00", response_body["creation"])
+
+
+class TestStats(TestCase):
+    def test_stats_follow_creations(self):
+        before = client.get("/articles/stats").json()
+        response: Response = client.post(
+            "/articles",
+            json={"title": "stats", "content": "b", "creation": "2100-01-01"},
+        )
+        self.assertEqual(201, response.status_code)
+        after = client.get("/articles/stats").json()
+        self.assertEqual(before["articles"] + 1, after["articles"])
+        self.assertGreater(after["version"], before["version"])
+        self.assertEqual("stats", after["latest"][0]["title"])
+        self.assertNotIn("content", after["latest"][0])
+
+    def test_stats_sort_naive_and_aware_dates(self):
+        for title, creation in (
+            ("naive", "2101-01-01T00:00:00"),
+            ("aware", "2101-01-02T00:00:00+00:00"),
+        ):
+            response: Response = client.post(
+                "/articles",
+                json={"title": title, "content": "b", "creation": creation},
+            )
+            self.assertEqual(201, response.status_code)
+        response = client.get("/articles/stats")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("aware", response.json()["latest"][0]["title"])
+
+    def test_stats_with_dates_near_year_one(self):
+        response: Response = client.post(
+            "/articles",
+            json={"title": "old", "content": "b", "creation": "0001-01-01"},
+        )
+        self.assertEqual(201, response.status_code)
+        response = client.get("/articles/stats")
+        self.assertEqual(200, response.status_code)
@@ -1,15 +1,50 @@
 import copy
+import time
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 from app.articles import _add  # type: ignore  -> Testing private functions
 from app.articles import _all  # type: ignore
+from app.articles import _contents  # type: ignore
+from app.articles import _delete  # type: ignore
 from app.articles import _get  # type: ignore
+from app.articles import _mutation  # type: ignore
+from app.articles import _tombstones  # type: ignore
 from app.articles import _update  # type: ignore
 from app.articles import (Article, ArticleId, RequestArticle, ResponseArticle,
-                          create, get_all, get_by_id, update)
-from app.exceptions import ArticleNotFoundError
+                          apply_patch, clear, compact, create, delete,
+                          get_all, get_by_id, update)
+from app.exceptions import (ArticleNotFoundError, InvalidArticleIdError,
+                            InvalidPatchError)
+
+
+class TestArticleId(unittest.TestCase):
+    def test_parse_valid_id(self):
+        article_id = ArticleId()
+        self.assertEqual(article_id, ArticleId.parse(article_id.as_str()))
+
+    def test_parse_invalid_id(self):
+        self.assertIsNone(ArticleId.parse("does not exist"))
+
+    def test_raises_on_invalid_id(self):
+        with self.assertRaises(InvalidArticleIdError):
+            ArticleId(id="does not exist")
+
+
+class TestArticle(unittest.TestCase):
+    def test_creation_is_cached_and_follows_date(self):
+        article = Article(content="c", title="t", date=datetime(2023, 1, 1))
+        self.assertEqual("2023-01-01T00:00:00", article.creation)
+        article.date = datetime(2024, 1, 1)
+        self.assertEqual("2024-01-01T00:00:00", article.creation)
+
+    def test_content_hash_follows_content(self):
+        article = Article(content="c", title="t", date=datetime(2023, 1, 1))
+        same = Article(content="c", title="u", date=datetime(2024, 1, 1))
+        self.assertEqual(same.content_hash, article.content_hash)
+        article.content = "new"
+        self.assertNotEqual(same.content_hash, article.content_hash)
 
 
 class TestRequestArticle(unittest.TestCase):
@@ -68,6 +103,7 @@ class TestProtectedFunctions(unittest.TestCase):
             content="c", title="t", date=self.now, id=self.article_id
         )
         _all.clear()
+        _tombstones.clear()
 
     def test__add(self):
         _add(self.article)
@@ -87,6 +123,38 @@ class TestProtectedFunctions(unittest.TestCase):
         updated = _all[self.article.id]
         self.assertEqual(self.new, updated)
 
+    def test__delete_hard(self):
+        _all[self.article.id] = self.article
+        _delete(self.article)
+        self.assertNotIn(self.article.id, _all)
+        self.assertNotIn(self.article.id, _tombstones)
+
+    def test__delete_soft_keeps_tombstone(self):
+        _all[self.article.id] = self.article
+        _delete(self.article, soft=True)
+        self.assertIn(self.article.id, _all)
+        self.assertIn(self.article.id, _tombstones)
+        self.assertIsNotNone(self.article.deleted)
+        self.assertIsNone(_get(self.article.id))
+
+    def test_compact_purges_old_tombstones_only(self):
+        old = Article(content="c", title="t", date=self.now)
+        for article in (old, self.article):
+            _all[article.id] = article
+            _delete(article, soft=True)
+        _tombstones[old.id] = old.deleted = self.now - timedelta(hours=1)
+        purged = compact(self.now, time.perf_counter() + 60)
+        self.assertEqual(1, purged)
+        self.assertNotIn(old.id, _all)
+        self.assertIn(self.article.id, _tombstones)
+
+    def test_compact_stops_at_deadline(self):
+        _all[self.article.id] = self.article
+        _delete(self.article, soft=True)
+        purged = compact(datetime.now(), time.perf_counter())
+        self.assertEqual(0, purged)
+        self.assertIn(self.article.id, _tombstones)
+
 
 class TestPublicFunctions(unittest.TestCase):
     def setUp(self) -> None:
@@ -176,3 +244,135 @@ class TestPublicFunctions(unittest.TestCase):
         # Actual updating action
         with self.assertRaises(ArticleNotFoundError):
             update(self.req_id, self.req_article)
+
+
+class TestDelete(unittest.TestCase):
+    def setUp(self) -> None:
+        self.article = Article(content="c", title="t", date=datetime.now())
+        _all.clear()
+        _tombstones.clear()
+        _all[self.article.id] = self.article
+
+    def test_delete_existing(self):
+        delete(self.article.id.as_str())
+        self.assertNotIn(self.article.id, _all)
+
+    @patch("app.articles.config.SOFT_DELETE", True)
+    def test_soft_delete_hides_article(self):
+        delete(self.article.id.as_str())
+        self.assertIn(self.article.id, _tombstones)
+        self.assertEqual([], get_all())
+        with self.assertRaises(ArticleNotFoundError):
+            get_by_id(self.article.id.as_str())
+        with self.assertRaises(ArticleNotFoundError):
+            delete(self.article.id.as_str())
+
+    def test_delete_not_existing(self):
+        with self.assertRaises(ArticleNotFoundError):
+            delete(ArticleId().as_str())
+
+
+class TestApplyPatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = datetime(2023, 2, 10, 16, 34, 17, 942779)
+        self.article = Article(content="c", title="t", date=self.now)
+        self.req_id = self.article.id.as_str()
+        _all.clear()
+        _all[self.article.id] = self.article
+
+    def test_only_given_members_are_modified(self):
+        apply_patch(self.req_id, {"title": "new title"})
+        self.assertIs(self.article, _all[self.article.id])
+        self.assertEqual("new title", self.article.title)
+        self.assertEqual("c", self.article.content)
+        self.assertEqual(self.now, self.article.date)
+
+    def test_creation_is_parsed(self):
+        apply_patch(self.req_id, {"creation": "2020-01-01T00:00:00"})
+        self.assertEqual(datetime(2020, 1, 1), self.article.date)
+
+    def test_same_id_is_accepted(self):
+        apply_patch(self.req_id, {"id": self.req_id, "content": "new"})
+        self.assertEqual("new", self.article.content)
+
+    def test_invalid_patches_are_rejected(self):
+        patches = [
+            {"title": None},
+            {"content": 1},
+            {"creation": None},
+            {"creation": "01/01/2023"},
+            {"id": ArticleId().as_str()},
+            {"author": "me"},
+        ]
+        for patch_ in patches:
+            with self.subTest(patch=patch_):
+                with self.assertRaises(InvalidPatchError):
+                    apply_patch(self.req_id, patch_)
+        self.assertEqual("t", self.article.title)
+
+    def test_patch_not_existing(self):
+        with self.assertRaises(ArticleNotFoundError):
+            apply_patch(ArticleId().as_str(), {"title": "new title"})
+
+
+class TestSharedContents(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = datetime(2023, 2, 10)
+        self.body = "".join(["body"] * 100)
+        clear()
+
+    def _article(self, title: str = "t") -> Article:
+        # Equal bodies built separately are distinct strings
+        return Article("".join(["body"] * 100), title, self.now)
+
+    def test_equal_bodies_are_stored_once(self):
+        first, second = self._article(), self._article()
+        self.assertIsNot(first.content, second.content)
+        _add(first)
+        _add(second)
+        self.assertIs(first.content, second.content)
+        self.assertEqual(1, len(_contents))
+        self.assertEqual(2, _contents.references(first.content_hash))
+
+    def test_update_moves_references(self):
+        old = self._article()
+        _add(old)
+        new = Article("other", "t", self.now)
+        _update(old, new)
+        self.assertEqual(0, _contents.references(old.content_hash))
+        self.assertEqual(1, _contents.references(new.content_hash))
+
+    def test_update_with_same_body_shares_it(self):
+        old = self._article()
+        _add(old)
+        new = self._article("new title")
+        _update(old, new)
+        self.assertIs(old.content, _all[old.id].content)
+        self.assertEqual(1, _contents.references(old.content_hash))
+
+    @patch("app.articles._mutation", wraps=_mutation)
+    def test_unchanged_article_is_not_written(self, mock_record: MagicMock):
+        old = self._article()
+        _add(old)
+        mock_record.reset_mock()
+        _update(old, self._article())
+        apply_patch(old.id.as_str(), {"content": self.body, "title": "t"})
+        mock_record.assert_not_called()
+        self.assertIs(old, _all[old.id])
+
+    def test_patch_moves_references(self):
+        article = self._article()
+        _add(article)
+        previous = article.content_hash
+        apply_patch(article.id.as_str(), {"content": "new"})
+        self.assertEqual(0, _contents.references(previous))
+        self.assertEqual(1, _contents.references(article.content_hash))
+
+    def test_tombstones_hold_their_body_until_purged(self):
+        article = self._article()
+        _add(article)
+        _delete(article, soft=True)
+        self.assertEqual(1, len(_contents))
+        _tombstones[article.id] = self.now
+        compact(datetime.now(), time.perf_counter() + 60)
+        self.assertEqual(0, len(_contents))
@@ -0,0 +1,58 @@
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from app.articles import _all  # type: ignore
+from app.articles import _delete  # type: ignore
+from app.articles import _tombstones  # type: ignore
+from app.articles import Article
+from app.compaction import Compactor
+from app.journal import JournalError
+
+
+class TestCompactor(unittest.TestCase):
+    def setUp(self) -> None:
+        _all.clear()
+        _tombstones.clear()
+        self.article = Article(content="c", title="t", date=datetime.now())
+        _all[self.article.id] = self.article
+        _delete(self.article, soft=True)
+        return super().setUp()
+
+    def test_raises_on_invalid_budget(self):
+        with self.assertRaises(ValueError):
+            Compactor(interval=1, budget=0, ttl=0)
+
+    def test_run_once_purges_expired_tombstones(self):
+        compactor = Compactor(interval=1, budget=1, ttl=0)
+        self.assertEqual(1, compactor.run_once())
+        self.assertEqual({}, _all)
+
+    def test_run_once_keeps_recent_tombstones(self):
+        compactor = Compactor(interval=1, budget=1, ttl=60)
+        self.assertEqual(0, compactor.run_once())
+        self.assertIn(self.article.id, _tombstones)
+
+    def test_failed_runs_do_not_stop_the_compactor(self):
+        retried = threading.Event()
+        failed: list[bool] = []
+
+        def compact(*_) -> int:
+            if not failed:
+                failed.append(True)
+                raise JournalError("disk full")
+            retried.set()
+            return 0
+
+        compactor = Compactor(interval=0.01, budget=1, ttl=0)
+        with patch("app.compaction.compact", compact):
+            compactor.start()
+            self.assertTrue(retried.wait(5))
+            compactor.stop()
+
+    def test_start_and_stop(self):
+        compactor = Compactor(interval=0.01, budget=1, ttl=0)
+        compactor.start()
+        compactor.stop()
+        self.assertIsNone(compactor._thread)  # type: ignore
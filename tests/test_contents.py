@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+from app.contents import ContentStore, content_hash
+
+
+class TestContentHash(unittest.TestCase):
+    def test_equal_bodies_have_equal_hashes(self):
+        self.assertEqual(content_hash("body"), content_hash("".join("body")))
+        self.assertNotEqual(content_hash("body"), content_hash("other"))
+        self.assertEqual(32, len(content_hash("body")))
+
+
+class TestContentStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = ContentStore()
+        self.body = "x" * 100
+        self.digest = content_hash(self.body)
+        return super().setUp()
+
+    def test_body_is_stored_once(self):
+        first = self.store.acquire(self.digest, self.body)
+        copy = "".join(["x" * 50, "x" * 50])
+        second = self.store.acquire(self.digest, copy)
+        self.assertIs(first, second)
+        self.assertEqual(1, len(self.store))
+        self.assertEqual(2, self.store.references(self.digest))
+
+    def test_body_is_dropped_once_unreferenced(self):
+        for _ in range(2):
+            self.store.acquire(self.digest, self.body)
+        self.store.release(self.digest)
+        self.assertEqual(self.body, self.store.get(self.digest))
+        self.store.release(self.digest)
+        self.assertIsNone(self.store.get(self.digest))
+        self.assertEqual(0, self.store.references(self.digest))
+
+    def test_concurrent_references_are_not_lost(self):
+        def churn() -> None:
+            for _ in range(1000):
+                self.store.acquire(self.digest, self.body)
+                self.store.release(self.digest)
+
+        self.store.acquire(self.digest, self.body)
+        threads = [threading.Thread(target=churn) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, self.store.references(self.digest))
+        self.assertEqual(self.body, self.store.get(self.digest))
+
+    def test_releasing_unknown_body_is_ignored(self):
+        self.store.release(self.digest)
+        self.assertEqual(0, len(self.store))
+
+    def test_metrics(self):
+        for _ in range(3):
+            self.store.acquire(self.digest, self.body)
+        self.store.acquire(content_hash("y"), "y")
+        self.assertEqual(
+            {
+                "bodies": 2,
+                "references": 4,
+                "stored_characters": 101,
+                "saved_characters": 200,
+            },
+            self.store.metrics(),
+        )
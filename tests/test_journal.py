@@ -0,0 +1,184 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.articles import _all  # type: ignore
+from app.articles import _tombstones  # type: ignore
+from app.articles import (RequestArticle, apply_patch, apply_records, clear,
+                          create, delete, get_all, set_journal, update)
+from app.exceptions import JournalError
+from app.journal import Journal, read, read_batches
+from app.routes import app
+
+client = TestClient(app)
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal.jsonl")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def test_appended_records_are_read_back(self):
+        journal = Journal(self.path)
+        journal.append({"op": "put", "id": "1"})
+        journal.append({"op": "purge", "id": "1"})
+        journal.close()
+        records = list(read(self.path))
+        self.assertEqual(["put", "purge"], [r["op"] for r, _ in records])
+        # Offsets allow to resume reading after a record
+        offset = records[0][1]
+        self.assertEqual(
+            [{"op": "purge", "id": "1"}],
+            [record for record, _ in read(self.path, offset)],
+        )
+
+    def test_read_batches(self):
+        with open(self.path, "w") as file:
+            file.write("".join(f'{{"n": {n}}}\n' for n in range(5)))
+        batches = list(read_batches(self.path, size=2))
+        self.assertEqual(
+            [[0, 1], [2, 3], [4]],
+            [[record["n"] for record in batch] for batch, _ in batches],
+        )
+        self.assertEqual(os.path.getsize(self.path), batches[-1][1])
+
+    def test_partial_line_is_not_read(self):
+        with open(self.path, "wb") as file:
+            file.write(b'{"op": "put"}\n{"op": "pu')
+        self.assertEqual(1, len(list(read(self.path))))
+
+    def test_concurrent_appends_are_committed_together(self):
+        journal = Journal(self.path, max_batch=8, max_delay=0.2)
+        threads = [
+            threading.Thread(target=journal.append, args=({"n": i},))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics = journal.metrics()
+        journal.close()
+        self.assertEqual(8, metrics["records"])
+        self.assertLess(metrics["batches"], 8)
+        self.assertLessEqual(metrics["largest_batch_size"], 8)
+        self.assertEqual(8, len(list(read(self.path))))
+
+    def test_write_errors_are_raised_to_writers(self):
+        journal = Journal(self.path)
+        journal.append({"op": "put", "n": 0})
+        fsync = MagicMock(side_effect=[OSError("disk full"), None])
+        with patch("app.journal.os.fsync", fsync):
+            with self.assertRaises(JournalError):
+                journal.append({"op": "put", "n": 1})
+        # Rejected mutation is truncated away, the journal is still usable
+        journal.append({"op": "put", "n": 2})
+        journal.close()
+        self.assertEqual([0, 2], [r["n"] for r, _ in read(self.path)])
+
+    def test_journal_fails_if_rejected_mutations_remain(self):
+        journal = Journal(self.path)
+        with patch("app.journal.os.fsync", side_effect=OSError("disk full")):
+            with patch("app.journal.os.ftruncate", side_effect=OSError()):
+                with self.assertRaises(JournalError):
+                    journal.append({"op": "put", "n": 0})
+        with self.assertRaises(JournalError):
+            journal.append({"op": "put", "n": 1})
+        self.assertTrue(journal.metrics()["failed"])
+        journal.close()
+        self.assertEqual([0], [r["n"] for r, _ in read(self.path)])
+
+    def test_callers_are_let_in_in_journal_order(self):
+        journal = Journal(self.path, max_batch=16, max_delay=0.05)
+        applied: list[int] = []
+
+        def append(n: int) -> None:
+            with journal.append_ordered({"n": n}):
+                applied.append(n)
+
+        threads = [
+            threading.Thread(target=append, args=(n,)) for n in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        journal.close()
+        self.assertEqual([r["n"] for r, _ in read(self.path)], applied)
+
+
+class TestJournaledStorage(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal.jsonl")
+        self.journal = Journal(self.path)
+        set_journal(self.journal)
+        _all.clear()
+        _tombstones.clear()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        set_journal(None)
+        self.journal.close()
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def test_replaying_journal_rebuilds_storage(self):
+        ids = [
+            create(RequestArticle(title=f"t{i}", content="c", creation=""))
+            for i in range(4)
+        ]
+        update(ids[0], RequestArticle(title="updated", content="new"))
+        apply_patch(ids[1], {"creation": "2020-01-01T00:00:00"})
+        delete(ids[2])
+        with patch("app.articles.config.SOFT_DELETE", True):
+            delete(ids[3])
+        expected = [(a.id, a.title, a.content, a.creation) for a in get_all()]
+        expected_tombstones = list(_tombstones)
+
+        clear()
+        for records, _ in read_batches(self.path, size=2):
+            apply_records(records)
+        output = [(a.id, a.title, a.content, a.creation) for a in get_all()]
+        self.assertEqual(expected, output)
+        self.assertEqual(expected_tombstones, list(_tombstones))
+
+    def test_concurrent_updates_are_applied_in_journal_order(self):
+        id = create(RequestArticle(title="t", content="c"))
+
+        def put(n: int) -> None:
+            update(id, RequestArticle(title=f"t{n}", content=f"c{n}"))
+
+        threads = [threading.Thread(target=put, args=(n,)) for n in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = [(a.title, a.content) for a in get_all()]
+        clear()
+        for records, _ in read_batches(self.path):
+            apply_records(records)
+        self.assertEqual(expected, [(a.title, a.content) for a in get_all()])
+
+    def test_mutation_is_not_applied_if_not_durable(self):
+        with patch("app.journal.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(JournalError):
+                create(RequestArticle(title="t", content="c"))
+        self.assertEqual({}, _all)
+
+    def test_returns_503_if_not_durable(self):
+        with patch("app.journal.os.fsync", side_effect=OSError("disk full")):
+            response: Response = client.post(
+                "/articles", json={"title": "t", "content": "c"}
+            )
+        self.assertEqual(503, response.status_code)
@@ -0,0 +1,163 @@
+import marshal
+import os
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.profiling import (MemoryTracer, RequestTimings, SamplingProfiler,
+                           TimingMiddleware, server_timing, span)
+
+
+def _busy(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(100))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.profiler = SamplingProfiler()
+        self.profiler.interval = 0.001
+        self.stop = threading.Event()
+        # Busy thread which does not serve any request
+        self.thread = threading.Thread(target=_busy, args=(self.stop,))
+        self.thread.start()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.stop.set()
+        self.thread.join()
+        self.profiler.stop()
+        return super().tearDown()
+
+    def test_raises_on_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            self.profiler.start(0)
+
+    def test_ignores_threads_outside_requests(self):
+        self.profiler.sample()
+        for stack in self.profiler.samples:
+            self.assertNotIn("_busy", [name for _, _, name in stack])
+
+    def test_ignores_background_threads_of_the_app(self):
+        stop = threading.Event()
+        # Runs code of the app, as the compactor thread does
+        thread = threading.Thread(
+            target=stop.wait, name="compactor", daemon=True
+        )
+        thread.start()
+        try:
+            with patch("app.profiling._REQUEST_PATHS", ("",)):
+                self.profiler.sample()
+        finally:
+            stop.set()
+            thread.join()
+        for stack in self.profiler.samples:
+            self.assertNotIn("wait", [name for _, _, name in stack[-3:]])
+
+    def test_exports(self):
+        stack = (
+            ("/app/routes.py", 1, "get_all_articles"),
+            ("/app/articles.py", 10, "get_all"),
+        )
+        self.profiler.samples[stack] += 3
+        collapsed = self.profiler.collapsed()
+        self.assertEqual(
+            "get_all_articles (routes.py:1);get_all (articles.py:10) 3\n",
+            collapsed,
+        )
+        stats = marshal.loads(self.profiler.pstats())
+        cc, nc, tt, ct, callers = stats[stack[1]]
+        self.assertEqual((3, 3), (cc, nc))
+        self.assertAlmostEqual(0.003, tt)
+        self.assertIn(stack[0], callers)
+        self.assertAlmostEqual(0.0, stats[stack[0]][2])
+        self.assertAlmostEqual(0.003, stats[stack[0]][3])
+
+    def test_pstats_is_readable_by_pstats(self):
+        self.profiler.samples[(("/app/routes.py", 1, "hello_world"),)] += 1
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "blog-api.prof")
+            with open(path, "wb") as file:
+                file.write(self.profiler.pstats())
+            stats = pstats.Stats(path)
+        self.assertEqual(1, stats.total_calls)  # type: ignore
+
+    def test_start_and_stop(self):
+        self.profiler.start(0.001)
+        self.assertTrue(self.profiler.running)
+        self.profiler.stop()
+        self.assertFalse(self.profiler.running)
+
+
+class TestMemoryTracer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tracer = MemoryTracer()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tracer.stop()
+        return super().tearDown()
+
+    def test_raises_if_not_tracing(self):
+        with self.assertRaises(RuntimeError):
+            self.tracer.top(10)
+
+    def test_top_and_diff(self):
+        self.tracer.start()
+        allocated = [bytearray(1024) for _ in range(1000)]
+        top = self.tracer.top(5)
+        self.assertLessEqual(len(top), 5)
+        self.assertTrue(top)
+        diff = self.tracer.diff(5)
+        self.assertTrue(any(site["size_diff"] > 1_000_000 for site in diff))
+        del allocated
+
+
+class TestTiming(unittest.TestCase):
+    def setUp(self) -> None:
+        self.profiler = SamplingProfiler()
+        self.request_timings = RequestTimings()
+        app = FastAPI()
+        app.add_middleware(
+            TimingMiddleware,
+            profiler=self.profiler,
+            request_timings=self.request_timings,
+            server_timing=True,
+        )
+
+        @app.get("/work")
+        def work() -> dict[str, str]:
+            with span("store"):
+                time.sleep(0.001)
+            return {"message": "done"}
+
+        self.client = TestClient(app)
+        return super().setUp()
+
+    def test_span_outside_request_does_nothing(self):
+        with span("store"):
+            pass
+
+    def test_server_timing_header(self):
+        response: Response = self.client.get("/work")
+        header = response.headers["server-timing"]
+        names = [metric.split(";")[0] for metric in header.split(", ")]
+        self.assertEqual(["store", "serialize", "total"], names)
+        self.assertEqual(0, self.profiler.active_requests)
+
+    def test_summary_includes_send(self):
+        self.client.get("/work")
+        summary = self.request_timings.summary()
+        self.assertEqual({"store", "serialize", "total", "send"}, set(summary))
+        self.assertGreaterEqual(summary["store"], 1.0)
+
+    def test_server_timing_format(self):
+        output = server_timing({"parse": 0.000052, "store": 0.5})
+        self.assertEqual("parse;dur=0.052, store;dur=500.000", output)
@@ -0,0 +1,133 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.ratelimit import (RateLimitMiddleware, TokenBuckets, client_key,
+                           route_cost)
+
+
+class TestTokenBuckets(unittest.TestCase):
+    def setUp(self) -> None:
+        self.buckets = TokenBuckets(rate=2, burst=4, size=2)
+        return super().setUp()
+
+    def test_burst_then_throttle(self):
+        for _ in range(4):
+            self.assertEqual(0, self.buckets.take("a", 1, now=0))
+        self.assertAlmostEqual(0.5, self.buckets.take("a", 1, now=0))
+        # Other clients have their own bucket
+        self.assertEqual(0, self.buckets.take("b", 4, now=0))
+
+    def test_refill_is_computed_when_client_comes_back(self):
+        self.buckets.take("a", 4, now=0)
+        self.assertAlmostEqual(1.0, self.buckets.take("a", 3, now=0.5))
+        self.assertEqual(0, self.buckets.take("a", 3, now=1.5))
+        # Never more than a full bucket
+        self.assertEqual(0, self.buckets.take("a", 4, now=100))
+        self.assertGreater(self.buckets.take("a", 1, now=100), 0)
+
+    def test_table_has_fixed_size(self):
+        self.buckets.take("a", 4, now=0)
+        self.buckets.take("b", 1, now=0)
+        self.buckets.take("a", 1, now=0)  # "b" is now the least recent
+        self.buckets.take("c", 1, now=0)
+        self.assertEqual(2, len(self.buckets))
+        self.assertEqual(1, self.buckets.evicted)
+        # "a" is still tracked, hence still throttled
+        self.assertGreater(self.buckets.take("a", 1, now=0), 0)
+
+    def test_full_buckets_are_evicted_silently(self):
+        self.buckets.take("a", 1, now=0)
+        self.buckets.take("b", 1, now=0)
+        self.buckets.take("c", 1, now=10)
+        self.assertEqual(0, self.buckets.evicted)
+
+    def test_metrics(self):
+        self.buckets.take("a", 4, now=0)
+        self.buckets.take("a", 4, now=0)
+        metrics = self.buckets.metrics()
+        self.assertEqual(1, metrics["allowed"])
+        self.assertEqual(1, metrics["throttled"])
+        self.assertEqual(1, metrics["clients"])
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            TokenBuckets(rate=0, burst=1)
+
+
+class TestRequestKeys(unittest.TestCase):
+    def test_client_key(self):
+        scope = {"headers": [(b"x-api-key", b"abc")], "client": ("1.2.3.4", 1)}
+        self.assertEqual("key:abc", client_key(scope, {"abc"}))
+        # Unknown keys must not give a fresh bucket
+        self.assertEqual("ip:1.2.3.4", client_key(scope, {"other"}))
+        self.assertEqual("ip:1.2.3.4", client_key(scope))
+        scope["headers"] = []
+        self.assertEqual("ip:1.2.3.4", client_key(scope))
+
+    def test_route_cost(self):
+        self.assertEqual(10, route_cost("GET", "/articles", 10))
+        self.assertEqual(10, route_cost("GET", "/articles/", 10))
+        self.assertEqual(1, route_cost("GET", "/articles/some-id", 10))
+        self.assertEqual(1, route_cost("POST", "/articles", 10))
+        self.assertEqual(0, route_cost("GET", "/admin/metrics", 10))
+
+
+class TestRateLimitMiddleware(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI()
+
+        @app.get("/articles")
+        def list_articles() -> list:
+            return []
+
+        @app.get("/articles/{id}")
+        def get_article(id: str) -> dict:
+            return {"id": id}
+
+        @app.get("/")
+        def root() -> dict:
+            return {}
+
+        # Nothing is given back during the test
+        self.buckets = TokenBuckets(rate=0.001, burst=12)
+        app.add_middleware(
+            RateLimitMiddleware,
+            buckets=self.buckets,
+            list_cost=10,
+            api_keys={"other"},
+        )
+        self.client = TestClient(app)
+        return super().setUp()
+
+    def test_listing_costs_more_than_point_reads(self):
+        self.assertEqual(200, self.client.get("/articles").status_code)
+        response: Response = self.client.get("/articles")
+        self.assertEqual(429, response.status_code)
+        self.assertGreater(int(response.headers["retry-after"]), 0)
+        for _ in range(2):
+            self.assertEqual(200, self.client.get("/articles/1").status_code)
+        self.assertEqual(429, self.client.get("/articles/1").status_code)
+        # Unlimited routes
+        self.assertEqual(200, self.client.get("/").status_code)
+
+    def test_clients_are_limited_separately(self):
+        self.client.get("/articles")
+        self.client.get("/articles")
+        response: Response = self.client.get(
+            "/articles", headers={"X-API-Key": "other"}
+        )
+        self.assertEqual(200, response.status_code)
+
+    def test_unknown_api_keys_are_limited_by_ip(self):
+        self.client.get("/articles")
+        response: Response = self.client.get(
+            "/articles", headers={"X-API-Key": "made-up"}
+        )
+        self.assertEqual(429, response.status_code)
+
+    def test_listing_must_fit_in_a_bucket(self):
+        with self.assertRaises(ValueError):
+            RateLimitMiddleware(None, self.buckets, list_cost=13)
@@ -0,0 +1,248 @@
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.articles import _all  # type: ignore
+from app.articles import _tombstones  # type: ignore
+from app.articles import ArticleId, clear, get_all
+from app.journal import Journal
+from app.replication import Follower, ReadOnlyMiddleware
+
+
+def _put(id: ArticleId, title: str) -> dict:
+    return {
+        "op": "put",
+        "id": id.as_str(),
+        "ts": time.time(),
+        "title": title,
+        "content": "c",
+        "creation": "2023-01-01T00:00:00",
+    }
+
+
+class TestFollower(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal.jsonl")
+        _all.clear()
+        _tombstones.clear()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def test_nothing_to_apply_without_journal(self):
+        follower = Follower(self.path)
+        self.assertEqual(0, follower.catch_up())
+        self.assertTrue(follower.metrics()["caught_up"])
+
+    def test_applies_new_mutations_only(self):
+        journal = Journal(self.path)
+        first, second = ArticleId(), ArticleId()
+        journal.append(_put(first, "t1"))
+        follower = Follower(self.path)
+        self.assertEqual(1, follower.catch_up())
+        journal.append(_put(second, "t2"))
+        journal.append({"op": "purge", "id": first.as_str(), "ts": 0})
+        self.assertFalse(follower.metrics()["caught_up"])
+        self.assertEqual(2, follower.catch_up())
+        journal.close()
+        self.assertEqual(["t2"], [a.title for a in get_all()])
+        metrics = follower.metrics()
+        self.assertTrue(metrics["caught_up"])
+        self.assertEqual(3, metrics["records_applied"])
+        self.assertEqual(os.path.getsize(self.path), metrics["offset"])
+
+    def test_replays_replaced_journal(self):
+        with open(self.path, "w") as file:
+            for i in range(3):
+                file.write(json.dumps(_put(ArticleId(), f"t{i}")) + "\n")
+        follower = Follower(self.path)
+        follower.catch_up()
+        with open(self.path, "w") as file:
+            file.write(json.dumps(_put(ArticleId(), "new")) + "\n")
+        follower.catch_up()
+        self.assertEqual(["new"], [a.title for a in get_all()])
+
+    def _write(self, *titles: str) -> None:
+        with open(self.path, "a") as file:
+            for title in titles:
+                file.write(json.dumps(_put(ArticleId(), title)) + "\n")
+
+    def test_drops_mutations_the_primary_truncated(self):
+        for longer in (False, True):
+            with self.subTest(longer=longer):
+                _all.clear()
+                self._write("kept")
+                synced = os.path.getsize(self.path)
+                self._write("rejected")
+                follower = Follower(self.path)
+                self.assertEqual(2, follower.catch_up())
+                # Primary failed to sync, then wrote the next batch in place,
+                # ending past the previous end of the journal or not
+                os.truncate(self.path, synced)
+                self._write("next" * (10 if longer else 1))
+                follower.catch_up()
+                self.assertEqual(
+                    ["kept", "next" * (10 if longer else 1)],
+                    [a.title for a in get_all()],
+                )
+                os.remove(self.path)
+
+    def test_unreadable_journal_is_not_replayed_forever(self):
+        self._write("kept")
+        with open(self.path, "a") as file:
+            file.write("{corrupt\n")
+        follower = Follower(self.path)
+        with patch("app.replication.clear", wraps=clear) as mock_clear:
+            with self.assertRaises(ValueError):
+                follower.catch_up()
+            with self.assertRaises(ValueError):
+                follower.catch_up()
+        self.assertEqual(1, mock_clear.call_count)
+        self.assertEqual(["kept"], [a.title for a in get_all()])
+
+
+class TestReadOnlyMiddleware(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = FastAPI()
+
+        @self.app.get("/articles")
+        def read() -> list:
+            return []
+
+        @self.app.post("/articles")
+        def write() -> None:
+            raise AssertionError("Writes must not reach followers")
+
+        @self.app.post("/admin/profiler/stop", status_code=204)
+        def admin() -> None:
+            pass
+
+        return super().setUp()
+
+    def test_reads_are_served(self):
+        self.app.add_middleware(ReadOnlyMiddleware)
+        response: Response = TestClient(self.app).get("/articles")
+        self.assertEqual(200, response.status_code)
+
+    def test_writes_are_rejected(self):
+        self.app.add_middleware(ReadOnlyMiddleware)
+        client = TestClient(self.app)
+        response: Response = client.post("/articles", json={})
+        self.assertEqual(405, response.status_code)
+        self.assertIn("GET", response.headers["allow"])
+        response = client.post("/admin/profiler/stop")
+        self.assertEqual(204, response.status_code)
+
+    def test_writes_are_forwarded(self):
+        self.app.add_middleware(
+            ReadOnlyMiddleware, primary_url="http://primary:8000/"
+        )
+        forwarded = httpx.Response(
+            201, headers={"Location": "/articles/1"}, content=b""
+        )
+        request = AsyncMock(return_value=forwarded)
+        with patch("httpx.AsyncClient.request", request):
+            response: Response = TestClient(self.app).post(
+                "/articles", json={"title": "t"}
+            )
+        self.assertEqual(201, response.status_code)
+        self.assertEqual("/articles/1", response.headers["location"])
+        method, url = request.call_args.args
+        self.assertEqual(("POST", "http://primary:8000/articles"), (method, url))
+
+    def test_returns_502_if_primary_unreachable(self):
+        self.app.add_middleware(
+            ReadOnlyMiddleware, primary_url="http://primary:8000"
+        )
+        request = MagicMock(side_effect=httpx.ConnectError("refused"))
+        with patch("httpx.AsyncClient.request", request):
+            response: Response = TestClient(self.app).post(
+                "/articles", json={}
+            )
+        self.assertEqual(502, response.status_code)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(importlib.util.find_spec("uvicorn"), "needs uvicorn")
+class TestPrimaryAndFollowerProcesses(unittest.TestCase):
+    def _serve(self, **environment: str) -> tuple[subprocess.Popen, str]:
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+            env={**os.environ, **environment},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(process.wait)
+        self.addCleanup(process.terminate)
+        url = f"http://127.0.0.1:{port}"
+        self._wait_for(lambda: httpx.get(url + "/").status_code == 200)
+        return process, url
+
+    def _wait_for(self, condition, timeout: float = 20) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if condition():
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.05)
+        self.fail("Condition not met in time")
+
+    def test_follower_serves_articles_written_to_primary(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        journal = os.path.join(directory.name, "journal.jsonl")
+        _, primary = self._serve(BLOG_API_JOURNAL_PATH=journal)
+        _, follower = self._serve(
+            BLOG_API_FOLLOW_JOURNAL=journal,
+            BLOG_API_FOLLOW_INTERVAL="0.01",
+            BLOG_API_PRIMARY_URL=primary,
+            BLOG_API_ADMIN="1",
+            BLOG_API_ADMIN_TOKEN="secret",
+        )
+
+        response = httpx.post(
+            primary + "/articles", json={"title": "t", "content": "c"}
+        )
+        location = response.headers["location"]
+        self._wait_for(
+            lambda: httpx.get(follower + location).status_code == 200
+        )
+        self.assertEqual("t", httpx.get(follower + location).json()["title"])
+
+        # Writes sent to the follower are forwarded to the primary
+        response = httpx.patch(follower + location, json={"title": "new"})
+        self.assertEqual(204, response.status_code)
+        self.assertEqual("new", httpx.get(primary + location).json()["title"])
+        self._wait_for(
+            lambda: httpx.get(follower + location).json()["title"] == "new"
+        )
+
+        metrics = httpx.get(
+            follower + "/admin/metrics", headers={"X-Admin-Token": "secret"}
+        ).json()["replication"]
+        self.assertTrue(metrics["caught_up"])
+        self.assertEqual(2, metrics["records_applied"])
+        self.assertGreaterEqual(metrics["lag_seconds"], 0)
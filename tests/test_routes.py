@@ -150,6 +150,9 @@ class TestNewArticle(unittest.TestCase):
             "/articles", json={"content": "b", "creation": "01/01/2023"}
         )  # type: ignore
         self.assertEqual(422, response.status_code)
+        self.assertEqual(
+            ["body", "title"], response.json()["detail"][0]["loc"]
+        )
 
     @patch("app.routes.create")
     def test_returns_422_if_request_empty(self, mock: MagicMock):
@@ -157,6 +160,14 @@ class TestNewArticle(unittest.TestCase):
         response: Response = client.post("/articles")  # type: ignore
         self.assertEqual(422, response.status_code)
 
+    @patch("app.routes.create")
+    def test_returns_400_if_body_undecodable(self, mock: MagicMock):
+        mock.return_value = None
+        response: Response = client.post(
+            "/articles", content=b"\xff\xfe{"
+        )  # type: ignore
+        self.assertEqual(400, response.status_code)
+
 
 class TestUpdateArticle(unittest.TestCase):
     @patch("app.routes.update")
@@ -206,3 +217,65 @@ class TestUpdateArticle(unittest.TestCase):
             "/articles/" + ArticleId().as_str()
         )  # type: ignore
         self.assertEqual(422, response.status_code)
+
+
+class TestPatchArticle(unittest.TestCase):
+    @patch("app.routes.apply_patch")
+    def test_returns_204_if_article_patched(self, mock: MagicMock):
+        mock.return_value = None
+        article_id = ArticleId().as_str()
+        response: Response = client.patch(
+            "/articles/" + article_id,
+            json={"title": "a"},
+            headers={"Content-Type": "application/merge-patch+json"},
+        )  # type: ignore
+        self.assertEqual(204, response.status_code)
+        mock.assert_called_once_with(article_id, {"title": "a"})
+
+    @patch("app.routes.apply_patch")
+    def test_returns_404_if_article_does_not_exist(self, mock: MagicMock):
+        mock.side_effect = ArticleNotFoundError()
+        response: Response = client.patch(
+            "/articles/" + ArticleId().as_str(), json={"title": "a"}
+        )  # type: ignore
+        self.assertEqual(404, response.status_code)
+
+    @patch("app.routes.apply_patch")
+    def test_returns_422_if_patch_invalid(self, mock: MagicMock):
+        mock.side_effect = InvalidPatchError()
+        response: Response = client.patch(
+            "/articles/" + ArticleId().as_str(), json={"title": None}
+        )  # type: ignore
+        self.assertEqual(422, response.status_code)
+
+    @patch("app.routes.apply_patch")
+    def test_returns_422_if_patch_not_an_object(self, mock: MagicMock):
+        response: Response = client.patch(
+            "/articles/" + ArticleId().as_str(), json=["a"]
+        )  # type: ignore
+        self.assertEqual(422, response.status_code)
+        mock.assert_not_called()
+
+
+class TestDeleteArticle(unittest.TestCase):
+    @patch("app.routes.delete")
+    def test_returns_204_if_article_deleted(self, mock: MagicMock):
+        mock.return_value = None
+        response: Response = client.delete(
+            "/articles/" + ArticleId().as_str()
+        )  # type: ignore
+        self.assertEqual(204, response.status_code)
+
+    @patch("app.routes.delete")
+    def test_returns_404_if_article_does_not_exist(self, mock: MagicMock):
+        mock.side_effect = ArticleNotFoundError()
+        response: Response = client.delete(
+            "/articles/" + ArticleId().as_str()
+        )  # type: ignore
+        self.assertEqual(404, response.status_code)
+
+    @patch("app.routes.delete")
+    def test_returns_400_if_id_invalid(self, mock: MagicMock):
+        mock.side_effect = InvalidRequestedIdError()
+        response: Response = client.delete("/articles/invalid")  # type: ignore
+        self.assertEqual(400, response.status_code)
@@ -0,0 +1,157 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from fastapi.exceptions import HTTPException, RequestValidationError
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.articles import _all  # type: ignore
+from app.articles import Article, ArticleId
+from app.exceptions import InvalidArticleBodyError
+from app.routes import app
+from app.serialization import OrjsonEngine, SerializationEngine, get_engine
+
+client = TestClient(app)
+
+
+class TestGetEngine(unittest.TestCase):
+    def test_default_engine(self):
+        self.assertIsInstance(get_engine("pydantic"), SerializationEngine)
+        self.assertFalse(get_engine("pydantic").encodes_articles)
+
+    def test_orjson_engine(self):
+        self.assertIsInstance(get_engine("orjson"), OrjsonEngine)
+
+    def test_raises_on_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            get_engine("unknown")
+
+    @patch("app.serialization.orjson", None)
+    def test_falls_back_if_orjson_missing(self):
+        engine = get_engine("orjson")
+        self.assertNotIsInstance(engine, OrjsonEngine)
+
+
+class TestEngines(unittest.TestCase):
+    engines = [SerializationEngine(), OrjsonEngine()]
+
+    def setUp(self) -> None:
+        self.now = datetime(2023, 2, 10, 16, 34, 17, 942779)
+        self.article = Article(
+            content="c", title="t", date=self.now, id=ArticleId()
+        )
+        self.expected = {
+            "title": "t",
+            "content": "c",
+            "creation": "2023-02-10T16:34:17.942779",
+            "id": self.article.id.as_str(),
+        }
+        return super().setUp()
+
+    def test_engines_encode_the_same_document(self):
+        for engine in self.engines:
+            with self.subTest(engine=engine.name):
+                output = json.loads(engine.encode_article(self.article))
+                self.assertEqual(self.expected, output)
+                output = json.loads(engine.encode_articles([self.article]))
+                self.assertEqual([self.expected], output)
+
+    def test_engines_decode_the_same_article(self):
+        raw = json.dumps({"title": "t", "content": "c", "creation": "x"})
+        for engine in self.engines:
+            with self.subTest(engine=engine.name):
+                output = engine.decode_article(raw.encode())
+                self.assertEqual("t", output.title)
+                self.assertEqual("c", output.content)
+                self.assertEqual("x", output.creation)
+                self.assertIsNone(output.id)
+
+    def test_engines_reject_invalid_bodies(self):
+        bodies = [b"", b"not json", b"[]", b'{"content": "c"}']
+        for engine in self.engines:
+            for raw in bodies:
+                with self.subTest(engine=engine.name, raw=raw):
+                    with self.assertRaises(
+                        (InvalidArticleBodyError, RequestValidationError)
+                    ):
+                        engine.decode_article(raw)
+
+    def test_engines_keep_fastapi_errors(self):
+        expected = {
+            b"": (["body"], "value_error.missing"),
+            b"{bad": (["body", 1], "value_error.jsondecode"),
+            b"[1]": (["body"], "type_error.dict"),
+            b'{"title": "t"}': (["body", "content"], "value_error.missing"),
+            b'{"title": {}, "content": "c"}': (
+                ["body", "title"],
+                "type_error.str",
+            ),
+        }
+        for engine in self.engines:
+            for raw, (loc, type_) in expected.items():
+                with self.subTest(engine=engine.name, raw=raw):
+                    with self.assertRaises(RequestValidationError) as context:
+                        engine.decode_article(raw)
+                    errors = json.loads(json.dumps(context.exception.errors()))
+                    self.assertEqual(loc, errors[0]["loc"])
+                    self.assertEqual(type_, errors[0]["type"])
+
+    def test_engines_reject_undecodable_bodies(self):
+        for engine in self.engines:
+            with self.subTest(engine=engine.name):
+                with self.assertRaises(HTTPException) as context:
+                    engine.decode_article(b"\xff\xfe{")
+                self.assertEqual(400, context.exception.status_code)
+
+    def test_engines_coerce_members(self):
+        raw = b'{"title": 1, "content": "c"}'
+        for engine in self.engines:
+            with self.subTest(engine=engine.name):
+                self.assertEqual("1", engine.decode_article(raw).title)
+
+    def test_engines_decode_patches(self):
+        for engine in self.engines:
+            with self.subTest(engine=engine.name):
+                output = engine.decode_patch(b'{"title": null}')
+                self.assertEqual({"title": None}, output)
+                with self.assertRaises(InvalidArticleBodyError):
+                    engine.decode_patch(b'"title"')
+                with self.assertRaises(InvalidArticleBodyError):
+                    engine.decode_patch(b"")
+
+
+@patch("app.routes.engine", OrjsonEngine())
+class TestRoutesWithOrjsonEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        _all.clear()
+        return super().setUp()
+
+    def test_create_and_get(self):
+        response: Response = client.post(
+            "/articles", json={"title": "a", "content": "b"}
+        )
+        self.assertEqual(201, response.status_code)
+        location = response.headers["location"]
+        response = client.get(location)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/json", response.headers["content-type"])
+        self.assertEqual("a", response.json()["title"])
+        response = client.get("/articles")
+        self.assertEqual(["a"], [a["title"] for a in response.json()])
+
+    def test_returns_422_if_article_invalid(self):
+        response: Response = client.post("/articles", json={"title": 1})
+        self.assertEqual(422, response.status_code)
+        self.assertEqual(
+            ["body", "content"], response.json()["detail"][0]["loc"]
+        )
+
+    def test_returns_400_if_body_undecodable(self):
+        response: Response = client.post("/articles", content=b"\xff\xfe{")
+        self.assertEqual(400, response.status_code)
+
+    def test_returns_404_if_not_found(self):
+        response: Response = client.get("/articles/" + ArticleId().as_str())
+        self.assertEqual(404, response.status_code)
@@ -0,0 +1,128 @@
+import pickle
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+
+from app import articles
+from app.articles import _get  # type: ignore
+from app.articles import _patch  # type: ignore
+from app.articles import (Article, ArticleId, RequestArticle, apply_patch,
+                          content_metrics, create, delete, get_all,
+                          get_by_id, map_articles, set_storage)
+from app.routes import app
+from app.serialization import OrjsonEngine
+from app.sharding import ShardedStore
+
+client = TestClient(app)
+
+
+def _title(article: Article) -> str:
+    return article.title
+
+
+class TestShardedStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.store = ShardedStore(3)
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.store.close()
+        return super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.store.clear()
+        return super().setUp()
+
+    def test_raises_without_shards(self):
+        with self.assertRaises(ValueError):
+            ShardedStore(0)
+
+    def test_keys_are_spread_by_range(self):
+        low = ArticleId(uuid=UUID(int=0))
+        high = ArticleId(uuid=UUID(int=2**128 - 1))
+        self.assertIs(self.store._shards[0], self.store._owner(low))
+        self.assertIs(self.store._shards[2], self.store._owner(high))
+
+    def test_behaves_like_a_dict(self):
+        ids = [ArticleId() for _ in range(20)]
+        for index, id in enumerate(ids):
+            self.store[id] = index
+        # Replacing a value keeps the position of its key
+        self.store[ids[0]] = -1
+        self.assertEqual(20, len(self.store))
+        self.assertEqual(ids, self.store.keys())
+        self.assertEqual([-1] + list(range(1, 20)), self.store.values())
+        self.assertEqual(5, self.store[ids[5]])
+        self.assertIn(ids[5], self.store)
+        self.assertEqual(5, self.store.pop(ids[5]))
+        self.assertNotIn(ids[5], self.store)
+        self.assertIsNone(self.store.get(ids[5]))
+        self.assertIsNone(self.store.pop(ids[5], None))
+        with self.assertRaises(KeyError):
+            self.store[ids[5]]
+        with self.assertRaises(KeyError):
+            del self.store[ids[5]]
+        del self.store[ids[6]]
+        self.assertEqual(18, len(list(self.store)))
+
+    def test_articles_are_stored_across_shards(self):
+        bodies = content_metrics()["bodies"]
+        set_storage(self.store)
+        try:
+            ids = [
+                create(RequestArticle(title=f"t{i}", content="c"))
+                for i in range(10)
+            ]
+            self.assertEqual(
+                [f"t{i}" for i in range(10)], [a.title for a in get_all()]
+            )
+            apply_patch(ids[1], {"title": "patched"})
+            self.assertEqual("patched", get_by_id(ids[1]).title)
+            delete(ids[0])
+            self.assertEqual(9, len(get_all()))
+            self.assertEqual("patched", map_articles(_title)[0])
+            # Bodies are held by the shards only
+            self.assertEqual(bodies, content_metrics()["bodies"])
+        finally:
+            set_storage({})
+        self.assertIsInstance(articles._all, dict)  # type: ignore
+
+    def test_patches_of_stale_copies_are_not_lost(self):
+        set_storage(self.store)
+        try:
+            id = ArticleId(id=create(RequestArticle(title="t", content="c")))
+            # Each reader holds its own copy, as with concurrent requests
+            first, second = _get(id), _get(id)
+            _patch(first, {"title": "patched"})
+            _patch(second, {"content": "patched"})
+            article = get_by_id(id.as_str())
+        finally:
+            set_storage({})
+        self.assertEqual("patched", article.title)
+        self.assertEqual("patched", article.content)
+
+    @patch("app.routes.engine", OrjsonEngine())
+    def test_listing_is_encoded_by_shards(self):
+        set_storage(self.store)
+        try:
+            for i in range(5):
+                create(RequestArticle(title=f"t{i}", content="c"))
+            response = client.get("/articles")
+        finally:
+            set_storage({})
+        self.assertEqual(200, response.status_code)
+        titles = [article["title"] for article in response.json()]
+        self.assertEqual([f"t{i}" for i in range(5)], titles)
+
+
+class TestArticlePickling(unittest.TestCase):
+    def test_article_survives_pickling(self):
+        article = Article(content="c", title="t", date=datetime(2023, 1, 1))
+        copy = pickle.loads(pickle.dumps(article))
+        self.assertEqual(article.id, copy.id)
+        self.assertEqual(article.creation, copy.creation)
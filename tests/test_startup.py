@@ -0,0 +1,134 @@
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.routes import app
+from app.startup import StartupReport, WarmupMiddleware, process_age
+
+
+class TestStartupReport(unittest.TestCase):
+    def test_process_age(self):
+        age = process_age()
+        if sys.platform.startswith("linux"):
+            self.assertIsNotNone(age)
+            self.assertGreaterEqual(age, 0)  # type: ignore
+
+    def test_phases_are_timed(self):
+        report = StartupReport()
+        with report.phase("sleep"):
+            time.sleep(0.01)
+        self.assertGreaterEqual(report.phases["sleep"], 0.01)
+        self.assertGreaterEqual(report.summary()["sleep"], 10)
+
+    def test_readiness(self):
+        report = StartupReport()
+        self.assertFalse(report.ready)
+        report.set_failed(RuntimeError("broken"))
+        self.assertFalse(report.as_dict()["ready"])
+        self.assertEqual("RuntimeError: broken", report.as_dict()["error"])
+        report.set_ready()
+        self.assertTrue(report.as_dict()["ready"])
+
+
+class TestWarmupMiddleware(unittest.TestCase):
+    def test_articles_wait_for_warm_up(self):
+        report = StartupReport()
+        test_app = FastAPI()
+
+        @test_app.get("/articles")
+        def list_articles() -> list:
+            return []
+
+        @test_app.get("/healthz")
+        def health() -> dict:
+            return {}
+
+        test_app.add_middleware(WarmupMiddleware, report=report)
+        client = TestClient(test_app)
+        response: Response = client.get("/articles")
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("1", response.headers["retry-after"])
+        self.assertEqual(200, client.get("/healthz").status_code)
+        report.set_ready()
+        self.assertEqual(200, client.get("/articles").status_code)
+
+
+class TestProbes(unittest.TestCase):
+    def test_healthz(self):
+        response: Response = TestClient(app).get("/healthz")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({"status": "ok"}, response.json())
+
+    def test_readyz_after_startup(self):
+        with TestClient(app) as client:
+            response: Response = client.get("/readyz")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.json()["ready"])
+        self.assertIn("total_ms", response.json())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(importlib.util.find_spec("uvicorn"), "needs uvicorn")
+class TestBackgroundWarmup(unittest.TestCase):
+    def test_alive_before_ready(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "journal.jsonl")
+        id = str(uuid.uuid4())
+        with open(path, "w") as file:
+            record = {
+                "op": "put",
+                "id": id,
+                "ts": 0,
+                "title": "t",
+                "content": "c",
+                "creation": "2023-01-01T00:00:00",
+            }
+            file.write(json.dumps(record) + "\n")
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+            env={
+                **os.environ,
+                "BLOG_API_JOURNAL_PATH": path,
+                "BLOG_API_BACKGROUND_WARMUP": "1",
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(process.wait)
+        self.addCleanup(process.terminate)
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(url + "/readyz").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        else:
+            self.fail("Not ready in time")
+        self.assertEqual(200, httpx.get(url + "/healthz").status_code)
+        phases = httpx.get(url + "/readyz").json()["phases_ms"]
+        self.assertIn("replay journal", phases)
+        self.assertIn("import fastapi", phases)
+        response = httpx.get(f"{url}/articles/{id}")
+        self.assertEqual("t", response.json()["title"])
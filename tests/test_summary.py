@@ -0,0 +1,83 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from app.articles import _add  # type: ignore
+from app.articles import _delete  # type: ignore
+from app.articles import Article, apply_patch, clear, store_version
+from app.summary import SummaryCache
+
+
+class TestSummaryCache(unittest.TestCase):
+    def setUp(self) -> None:
+        clear()
+        self.articles = [
+            Article("c", f"t{year}", datetime(year, 1, 1))
+            for year in (2021, 2023, 2022)
+        ]
+        for article in self.articles:
+            _add(article)
+        self.cache = SummaryCache(latest=2)
+        return super().setUp()
+
+    def _summary(self) -> dict:
+        return json.loads(self.cache.encoded())
+
+    def test_counts_and_lists_latest_articles(self):
+        summary = self._summary()
+        self.assertEqual(3, summary["articles"])
+        self.assertEqual(store_version(), summary["version"])
+        self.assertEqual(
+            [
+                {
+                    "id": self.articles[1].id.as_str(),
+                    "title": "t2023",
+                    "creation": "2023-01-01T00:00:00",
+                },
+                {
+                    "id": self.articles[2].id.as_str(),
+                    "title": "t2022",
+                    "creation": "2022-01-01T00:00:00",
+                },
+            ],
+            summary["latest"],
+        )
+
+    def test_naive_and_aware_dates_are_sorted_together(self):
+        # Naive dates are taken as UTC, whatever the local time zone
+        aware = datetime(2025, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+        _add(Article("c", "aware", aware))
+        _add(Article("c", "naive", datetime(2025, 1, 1, 11)))
+        self.assertEqual(
+            ["naive", "aware"], [h["title"] for h in self._summary()["latest"]]
+        )
+
+    def test_dates_near_year_one_are_sorted(self):
+        _add(Article("c", "first", datetime(1, 1, 1)))
+        _add(Article("c", "aware", datetime(1, 1, 2, tzinfo=timezone.utc)))
+        self.cache.latest = 5
+        titles = [h["title"] for h in self._summary()["latest"]]
+        self.assertEqual(["aware", "first"], titles[-2:])
+
+    def test_unchanged_storage_is_not_walked_again(self):
+        first = self.cache.encoded()
+        self.assertIs(first, self.cache.encoded())
+        self.assertEqual(1, self.cache.builds)
+
+    def test_mutations_are_reflected(self):
+        self._summary()
+        apply_patch(self.articles[0].id.as_str(), {"title": "new"})
+        _delete(self.articles[1], soft=True)
+        _add(Article("c", "newest", datetime(2024, 1, 1)))
+        summary = self._summary()
+        self.assertEqual(3, summary["articles"])
+        self.assertEqual(
+            ["newest", "t2022"], [h["title"] for h in summary["latest"]]
+        )
+        self.assertEqual(2, self.cache.builds)
+
+    def test_no_op_updates_keep_the_cache(self):
+        self._summary()
+        apply_patch(self.articles[0].id.as_str(), {"title": "t2021"})
+        self._summary()
+        self.assertEqual(1, self.cache.builds)
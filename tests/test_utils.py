@@ -1,7 +1,39 @@
 from datetime import datetime
 from unittest import TestCase
+from uuid import UUID, uuid4
 
-from app.utils import datetime_to_iso_string, iso_string_to_datetime
+from app.utils import (datetime_to_iso_string, iso_string_to_datetime,
+                       iso_strings_to_datetimes, string_to_uuid)
+
+
+class TestStringToUuid(TestCase):
+    def setUp(self) -> None:
+        self.uuid = uuid4()
+        return super().setUp()
+
+    def test_with_canonical_string(self):
+        self.assertEqual(self.uuid, string_to_uuid(str(self.uuid)))
+        self.assertEqual(self.uuid, string_to_uuid(str(self.uuid).upper()))
+
+    def test_with_other_forms_accepted_by_uuid(self):
+        inputs = [
+            "{%s}" % self.uuid,
+            "urn:uuid:%s" % self.uuid,
+            self.uuid.hex,
+        ]
+        for input in inputs:
+            with self.subTest(input=input):
+                self.assertEqual(self.uuid, string_to_uuid(input))
+
+    def test_returns_none_on_invalid_string(self):
+        inputs = ["", "does not exist", str(self.uuid)[:-1] + "g"]
+        for input in inputs:
+            with self.subTest(input=input):
+                self.assertIsNone(string_to_uuid(input))
+
+    def test_agrees_with_uuid_on_valid_strings(self):
+        input = str(self.uuid)
+        self.assertEqual(UUID(input), string_to_uuid(input))
 
 
 class TestIsoStringToDatetime(TestCase):
@@ -30,6 +62,40 @@ class TestIsoStringToDatetime(TestCase):
         after = datetime.now()
         self.assertTrue(before <= output <= after)
 
+    def test_returns_now_on_invalid_iso_like_string(self):
+        input = "2023-13-01"
+        before = datetime.now()
+        output = iso_string_to_datetime(input)
+        after = datetime.now()
+        self.assertTrue(before <= output <= after)
+
+    def test_returns_given_now_on_invalid_string(self):
+        output = iso_string_to_datetime("01/01/2023", now=self.now)
+        self.assertEqual(self.now, output)
+
+    def test_with_other_iso_forms(self):
+        inputs = ["2023-02-10", "20230210", "2023-W06-5", "2023-02-10 00:00"]
+        for input in inputs:
+            with self.subTest(input=input):
+                output = iso_string_to_datetime(input, now=self.now)
+                self.assertEqual(datetime(2023, 2, 10), output)
+
+
+class TestIsoStringsToDatetimes(TestCase):
+    def test_converts_in_order(self):
+        inputs = ["2023-02-10", None, "invalid", "2023-13-01", ""]
+        before = datetime.now()
+        output = iso_strings_to_datetimes(inputs)
+        after = datetime.now()
+        self.assertEqual(len(inputs), len(output))
+        self.assertEqual(datetime(2023, 2, 10), output[0])
+        # Invalid strings share the same current date
+        self.assertTrue(before <= output[1] <= after)
+        self.assertEqual(output[1:], [output[1]] * 4)
+
+    def test_with_empty_input(self):
+        self.assertEqual([], iso_strings_to_datetimes([]))
+
 
 class TestDatetimeToIsoString(TestCase):
     def setUp(self) -> None: